@@ -0,0 +1,80 @@
+"""Simulated BatMon BLE backend for the benchmarks.
+
+Stands in for ``establish_connection`` and answers the sensor command and
+device API protocol with plausible, slowly drifting readings.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from struct import pack, unpack_from
+
+from custom_components.batmon_bm.batmon import BmConst
+from custom_components.batmon_bm.const import UUID_DEVICE_API, UUID_SENSORS_COMMAND
+
+_BASE_VALUES = {
+    BmConst.Type.BAT_VOLTS: 12.8,
+    BmConst.Type.EXT_VOLTS: 13.4,
+    BmConst.Type.INT_TEMP: 24.0,
+    BmConst.Type.EXT_TEMP: 18.0,
+    BmConst.Type.BAT_CURRENT: -4.2,
+    BmConst.Type.BAT_AMPHOURS: -35.0,
+}
+
+
+class FakeBatMonClient:
+    """Answers BatMon GATT traffic after a simulated round-trip latency."""
+
+    def __init__(self, address: str, latency: float, jitter: float) -> None:
+        self.address = address
+        self._latency = latency
+        self._jitter = jitter
+        self._request = b"\0\0\0"
+        self._pins = {BmConst.Type.RELAY_PIN: 0.0, BmConst.Type.SWITCH_PIN: 0.0}
+        self.is_connected = True
+
+    async def _delay(self) -> None:
+        await asyncio.sleep(self._latency + random.uniform(0, self._jitter))
+
+    async def write_gatt_char(self, uuid, data, response: bool = True) -> None:
+        await self._delay()
+        if uuid == UUID_SENSORS_COMMAND:
+            self._request = bytes(data)
+        elif uuid == UUID_DEVICE_API:
+            # api_ref, tagged io type, tagged value
+            io_type = unpack_from("<i", data, 3)[0]
+            value = unpack_from("<i", data, 8)[0]
+            pin = (BmConst.Type.SWITCH_PIN if io_type == 3
+                   else BmConst.Type.RELAY_PIN)
+            self._pins[pin] = float(value)
+
+    async def read_gatt_char(self, uuid) -> bytes:
+        await self._delay()
+        sensor_type, mode = self._request[0], self._request[1]
+        if sensor_type in self._pins:
+            value = self._pins[sensor_type]
+        else:
+            value = _BASE_VALUES.get(sensor_type, 0.0) * random.uniform(0.98, 1.02)
+        reply = bytes([sensor_type, mode, 4]) + pack("<f", value)
+        if mode != BmConst.Mode.VALUE:
+            reply += b"\0\0\0\0"
+        return reply
+
+    async def disconnect(self) -> None:
+        self.is_connected = False
+
+    async def clear_cache(self) -> None:
+        """Nothing cached."""
+
+
+def fake_establish_connection(
+    connect_latency: float = 0.05, latency: float = 0.005, jitter: float = 0.002
+):
+    """Return a drop-in for bleak_retry_connector.establish_connection."""
+
+    async def _establish_connection(client_class, ble_device, name, **kwargs):
+        await asyncio.sleep(connect_latency)
+        return FakeBatMonClient(ble_device.address, latency, jitter)
+
+    return _establish_connection
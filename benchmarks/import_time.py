@@ -0,0 +1,146 @@
+"""Import-time benchmark of the integration's modules.
+
+Imports each module in a fresh interpreter with ``-X importtime`` and
+prints one JSON document with the median cumulative import time, the
+slowest imports it pulled in, and which heavy dependencies it loaded:
+
+    python -m benchmarks.import_time --runs 5
+    python -m benchmarks.import_time --budget custom_components.batmon_bm=5
+
+With ``--budget MODULE=MS`` the exit status is 1 when a module takes
+longer, so load-time regressions can fail a check. Modules that cannot be
+imported (Home Assistant not installed, say) are reported, not fatal, and
+their budgets are not checked.
+Run it from the repository root so ``custom_components`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+PACKAGE = "custom_components.batmon_bm"
+
+DEFAULT_MODULES = [
+    PACKAGE,
+    f"{PACKAGE}.batmon",
+    f"{PACKAGE}.poller",
+    f"{PACKAGE}.config_flow",
+    f"{PACKAGE}.coordinator",
+    f"{PACKAGE}.sensor",
+    f"{PACKAGE}.switch",
+    f"{PACKAGE}.services",
+    f"{PACKAGE}.websocket_api",
+]
+
+# Dependencies worth knowing about when a module pulls them in
+HEAVY_IMPORTS = [
+    "homeassistant",
+    "homeassistant.components.recorder",
+    "bleak",
+    "bleak_retry_connector",
+    "cProfile",
+]
+
+TOP = 10
+
+
+def _import_once(
+    module: str,
+) -> tuple[dict[str, tuple[int, int]], set[str], str | None]:
+    """Import a module in a fresh interpreter.
+
+    Returns the self and cumulative microseconds of every import attempt,
+    the modules that ended up loaded, and the error if the import failed.
+    """
+    # importtime also lists imports that failed and were caught, only
+    # sys.modules tells what was really loaded
+    code = f"import sys\nimport {module}\nprint(*sys.modules, sep='\\n')"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=False,
+    )
+    timings: dict[str, tuple[int, int]] = {}
+    error = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            if line.strip():
+                error = line.strip()
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header line
+            continue
+        timings[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    if result.returncode:
+        return timings, set(), error
+    return timings, set(result.stdout.split()), None
+
+
+def measure(module: str, runs: int) -> dict[str, Any]:
+    """Median import time of a module over several fresh interpreters."""
+    cumulative: list[int] = []
+    self_times: dict[str, list[int]] = {}
+    timings: dict[str, tuple[int, int]] = {}
+    loaded: set[str] = set()
+    for _ in range(runs):
+        timings, loaded, error = _import_once(module)
+        if error is not None:
+            return {"error": error}
+        cumulative.append(timings[module][1])
+        for name, (self_us, _) in timings.items():
+            self_times.setdefault(name, []).append(self_us)
+
+    slowest = sorted(
+        ((name, statistics.median(samples)) for name, samples in self_times.items()),
+        key=lambda item: item[1], reverse=True)[:TOP]
+    return {
+        "cumulative_ms": round(statistics.median(cumulative) / 1000, 3),
+        "modules_imported": len(timings),
+        "slowest_self_ms": {name: round(us / 1000, 3) for name, us in slowest},
+        "pulls_in": [name for name in HEAVY_IMPORTS if name in loaded],
+    }
+
+
+def _budget(value: str) -> tuple[str, float]:
+    module, _, limit = value.rpartition("=")
+    if not module:
+        raise argparse.ArgumentTypeError("expected MODULE=MS")
+    return module, float(limit)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5,
+                        help="fresh interpreters per module, the median is reported")
+    parser.add_argument("--budget", type=_budget, action="append", default=[],
+                        metavar="MODULE=MS",
+                        help="fail when the module's cumulative import time is higher, "
+                             "unless it cannot be imported")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    modules = list(dict.fromkeys([*args.modules, *(module for module, _ in args.budget)]))
+    result = {module: measure(module, args.runs) for module in modules}
+
+    over_budget = {
+        module: limit for module, limit in args.budget
+        if "error" not in result[module] and result[module]["cumulative_ms"] > limit
+    }
+    text = json.dumps({"python": sys.version.split()[0], "modules": result,
+                       "over_budget": over_budget}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Scale and soak benchmark of the integration inside a test Home Assistant.
+
+Loads N ``batmon_bm`` config entries backed by the simulated BLE backend in
+``fake_batmon`` and drives refresh cycles (plus some switch toggles) by hand.
+Prints one JSON document so results can be tracked over time:
+
+    pip install pytest-homeassistant-custom-component
+    python -m benchmarks.scale_benchmark --devices 100 --cycles 20
+
+Run it from the repository root so ``custom_components`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+from bleak.backends.device import BLEDevice
+from homeassistant import loader
+from homeassistant.const import (
+    CONF_SCAN_INTERVAL,
+    EVENT_STATE_CHANGED,
+    EVENT_STATE_REPORTED,
+)
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.batmon_bm.const import DOMAIN
+
+from .fake_batmon import fake_establish_connection
+
+LAG_INTERVAL = 0.01
+
+
+def _percentiles(samples: list[float]) -> dict[str, float] | None:
+    """Summarise samples given in seconds as milliseconds."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pick(pct: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "p50": round(pick(50) * 1000, 3),
+        "p95": round(pick(95) * 1000, 3),
+        "p99": round(pick(99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def _monitor_loop_lag(samples: list[float]) -> None:
+    """Record how late the event loop wakes a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+
+async def _timed(samples: list[float], coro) -> None:
+    start = time.perf_counter()
+    await coro
+    samples.append(time.perf_counter() - start)
+
+
+def _address(index: int) -> str:
+    return "BA:7D:00:00:{:02X}:{:02X}".format(index >> 8, index & 0xFF)
+
+
+async def _async_run(hass: HomeAssistant, args: argparse.Namespace) -> dict[str, Any]:
+    # Same as the enable_custom_integrations fixture
+    hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+    # The real adapters are never used, the backend is simulated
+    hass.config.components.add("bluetooth_adapters")
+
+    entries = []
+    for index in range(args.devices):
+        address = _address(index)
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            unique_id=address,
+            title=f"Bench {index}",
+            data={"address": address, "state_of_charge_required": True,
+                  "battery_capacity": "200"},
+            # Refreshes are driven by the benchmark, not by the timers
+            options={CONF_SCAN_INTERVAL: 24 * 3600},
+        )
+        entries.append(entry)
+
+    state_changes = 0
+    state_reports = 0
+
+    def _count_change(event) -> None:
+        nonlocal state_changes
+        state_changes += 1
+
+    def _count_report(event) -> None:
+        nonlocal state_reports
+        state_reports += 1
+
+    @callback
+    def _any_report(event_data) -> bool:
+        return True
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _count_change)
+    hass.bus.async_listen(EVENT_STATE_REPORTED, _count_report, event_filter=_any_report)
+
+    # The first entry sets up the component and imports everything, which
+    # is a one-time cost reported apart from the per-device cost
+    warm_up, *others = entries
+    warm_up.add_to_hass(hass)
+    tracemalloc.start()
+    memory_start = tracemalloc.get_traced_memory()[0]
+    setup_start = time.perf_counter()
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    memory_warm = tracemalloc.get_traced_memory()[0]
+    for entry in others:
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    setup_seconds = time.perf_counter() - setup_start
+    memory_per_device = (
+        (tracemalloc.get_traced_memory()[0] - memory_warm) / len(others)
+        if others else None)
+    memory_first_device = memory_warm - memory_start
+    tracemalloc.stop()
+    assert all(entry.state is ConfigEntryState.LOADED for entry in entries)
+
+    coordinators = [entry.runtime_data for entry in entries]
+    switches = [
+        state.entity_id for state in hass.states.async_all("switch")
+        if state.entity_id.endswith("relay_state")
+    ]
+
+    lag_samples: list[float] = []
+    refresh_samples: list[float] = []
+    switch_samples: list[float] = []
+    cycle_samples: list[float] = []
+    lag_task = asyncio.create_task(_monitor_loop_lag(lag_samples))
+    state_changes = state_reports = 0
+    try:
+        for _ in range(args.cycles):
+            toggles = random.sample(switches, min(args.toggles, len(switches)))
+            cycle_start = time.perf_counter()
+            await asyncio.gather(
+                *(_timed(refresh_samples, coordinator.async_refresh())
+                  for coordinator in coordinators),
+                *(_timed(switch_samples, hass.services.async_call(
+                    "switch", "toggle", {"entity_id": entity_id}, blocking=True))
+                  for entity_id in toggles),
+            )
+            await hass.async_block_till_done()
+            cycle_samples.append(time.perf_counter() - cycle_start)
+    finally:
+        lag_task.cancel()
+
+    return {
+        "devices": args.devices,
+        "cycles": args.cycles,
+        "toggles_per_cycle": args.toggles,
+        "round_trip_latency_ms": args.latency * 1000,
+        "setup_seconds": round(setup_seconds, 3),
+        # Includes the one-time cost of setting up the component
+        "memory_first_device_bytes": memory_first_device,
+        "memory_per_device_bytes": (
+            round(memory_per_device) if memory_per_device is not None else None),
+        "state_changes_per_cycle": state_changes / args.cycles,
+        "state_reports_per_cycle": state_reports / args.cycles,
+        "loop_lag_ms": _percentiles(lag_samples),
+        "refresh_latency_ms": _percentiles(refresh_samples),
+        "switch_latency_ms": _percentiles(switch_samples),
+        "cycle_ms": _percentiles(cycle_samples),
+    }
+
+
+async def async_main(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the benchmark in a fresh test Home Assistant."""
+    ble_devices: dict[str, BLEDevice] = {}
+
+    def _ble_device_from_address(hass, address, connectable=True):
+        if address not in ble_devices:
+            # rssi is required by bleak 0.22 and ignored by later versions
+            ble_devices[address] = BLEDevice(
+                address, f"BK-{address[-5:]}", {"source": "bench"}, rssi=-60)
+        return ble_devices[address]
+
+    async def _no_stale_connections(address):
+        return None
+
+    with (
+        patch("custom_components.batmon_bm.connection_pool.establish_connection",
+              fake_establish_connection(args.connect_latency, args.latency,
+                                        args.jitter)),
+        patch("homeassistant.components.bluetooth.async_ble_device_from_address",
+              _ble_device_from_address),
+        patch("custom_components.batmon_bm.coordinator.close_stale_connections_by_address",
+              _no_stale_connections),
+    ):
+        async with async_test_home_assistant() as hass:
+            return await _async_run(hass, args)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--toggles", type=int, default=5,
+                        help="relay toggles issued during each cycle")
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="simulated GATT operation latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.002)
+    parser.add_argument("--connect-latency", type=float, default=0.05)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(async_main(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,35 +2,80 @@
 
 from __future__ import annotations
 
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-from .const import MAX_RETRIES_AFTER_STARTUP
-from .coordinator import BatMonBLEConfigEntry, BatMonBLEDataUpdateCoordinator
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
-PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.SWITCH]
+    from .coordinator import BatMonBLEConfigEntry
+
+from .const import DOMAIN
+
+# Home Assistant imports stay inside the setup functions so the protocol
+# modules and the headless poller (``python -m custom_components.batmon_bm``)
+# can be imported without Home Assistant installed.
+PLATFORMS: list[str] = ["sensor", "switch"]
+
+
+def _config_entry_only_config_schema():
+    """Schema flagging YAML config of the integration, None without Home Assistant."""
+    try:
+        from homeassistant.helpers import config_validation as cv
+    except ImportError:
+        return None
+    return cv.config_entry_only_config_schema(DOMAIN)
+
+
+CONFIG_SCHEMA = _config_entry_only_config_schema()
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the BatMon services and WebSocket API."""
+    services_module = await hass.async_add_import_executor_job(
+        import_module, f"{__package__}.services"
+    )
+    services_module.async_setup_services(hass)
+    websocket_api_module = await hass.async_add_import_executor_job(
+        import_module, f"{__package__}.websocket_api"
+    )
+    websocket_api_module.async_setup_websocket_api(hass)
+    return True
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: BatMonBLEConfigEntry
 ) -> bool:
     """Set up Batmon BLE device from a config entry."""
-    coordinator = BatMonBLEDataUpdateCoordinator(hass, entry)
+    # Pulls in bleak and the Home Assistant helpers, keep it off the loop
+    coordinator_module = await hass.async_add_import_executor_job(
+        import_module, f"{__package__}.coordinator"
+    )
+    coordinator = coordinator_module.BatMonBLEDataUpdateCoordinator(hass, entry)
     await coordinator.async_config_entry_first_refresh()
 
     # Once its setup and we know we are not going to delay
     # the startup of Home Assistant, we can set the max attempts
     # to a higher value. If the first connection attempt fails,
     # Home Assistant's built-in retry logic will take over.
-    coordinator.batmon.set_max_attempts(MAX_RETRIES_AFTER_STARTUP)
+    coordinator.async_apply_options()
 
     entry.runtime_data = coordinator
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def _async_update_options(
+    hass: HomeAssistant, entry: BatMonBLEConfigEntry
+) -> None:
+    """Retune the running coordinator, no reload or reconnect needed."""
+    entry.runtime_data.async_apply_options()
+
+
 async def async_unload_entry(
     hass: HomeAssistant, entry: BatMonBLEConfigEntry
 ) -> bool:
@@ -0,0 +1,7 @@
+"""Run the headless BatMon poller."""
+
+import sys
+
+from .poller import main
+
+sys.exit(main())
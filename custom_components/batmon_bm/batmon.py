@@ -1,15 +1,50 @@
+from __future__ import annotations
+
 import asyncio
+from collections import deque
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from contextlib import asynccontextmanager
+from copy import copy
+import dataclasses
+from dataclasses import dataclass, field
 from enum import IntEnum
 from functools import partial
+from heapq import heappop, heappush
+from itertools import count
 import logging
-from struct import pack, unpack
+from struct import Struct, pack, unpack
 import sys
+from time import monotonic, time
+from types import MappingProxyType
+from typing import Any
 from bleak import BleakClient, BleakError
 from bleak.backends.device import BLEDevice
-from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
 from async_interrupt import interrupt
 
-from .const import DEFAULT_MAX_UPDATE_ATTEMPTS, UPDATE_TIMEOUT, UUID_DEVICE_API, UUID_SENSORS_COMMAND
+from .connection_pool import connection_pool_for
+from .device_api import ApiCall, ApiMethod, sensor_command
+from .const import (
+    COALESCE_WINDOW,
+    DEFAULT_MAX_UPDATE_ATTEMPTS,
+    LATENCY_MIN_SAMPLES,
+    LATENCY_SAMPLES,
+    ROUND_TRIP_DEADLINE_FACTOR,
+    ROUND_TRIP_RETRIES,
+    ROUND_TRIP_TIMEOUT_MAX,
+    ROUND_TRIP_TIMEOUT_MIN,
+    SYNC_BARRIER_TIMEOUT,
+    UPDATE_TIMEOUT,
+    UUID_DEVICE_API,
+    UUID_SENSORS_COMMAND,
+)
 
 if sys.version_info[:2] < (3, 11):
     from async_timeout import timeout as asyncio_timeout
@@ -27,6 +62,16 @@ class UnsupportedDeviceError(Exception):
     """Unsupported device."""
 
 
+class _SessionClosed(Exception):
+    """The session an operation was queued on ended before running it."""
+
+
+class OperationPriority(IntEnum):
+    """Order in which queued operations share the device connection."""
+    COMMAND = 0
+    POLL = 1
+
+
 class BmConst:
     class Mode(IntEnum):
         VALUE = 0
@@ -48,6 +93,32 @@ class BmConst:
         SWITCH_PIN = 7
         MAX_TYPES = 7
 
+    class IoType(IntEnum):
+        RELAY = 2
+        SWITCH = 3
+
+
+# Device API methods
+API_SET_IO = 606
+
+SET_IO = ApiMethod(
+    "set_io", API_SET_IO, ("io_type", "value"),
+    readback=lambda io_type, value: (
+        BmConst.Type.SWITCH_PIN if io_type == BmConst.IoType.SWITCH
+        else BmConst.Type.RELAY_PIN),
+    decode=lambda value: bool(value) if value is not None else None,
+)
+
+SWITCH_IO_TYPES = {
+    "relay_state": BmConst.IoType.RELAY,
+    "switch_state": BmConst.IoType.SWITCH,
+}
+
+
+def set_switch(attr: str, turn_on: bool) -> ApiCall:
+    """Call switching the relay or switch pin, confirmed by reading it back."""
+    return SET_IO(SWITCH_IO_TYPES.get(attr, BmConst.IoType.RELAY), int(turn_on))
+
 
 class CPopByteArray:
     def init(self, raw):
@@ -81,8 +152,33 @@ class CPopByteArray:
         return unpack('>f', pack('I', int(s, 2)))[0]
 
 
+# type, mode, length and the little-endian float every reply starts with
+_REPLY_VALUE = Struct("<BBBf")
+# Min and max replies follow it with the big-endian epoch of the extreme
+_REPLY_EPOCH = Struct(">I")
+_REPLY_EXTREME_SIZE = _REPLY_VALUE.size + _REPLY_EPOCH.size
+
+
 class BatmonSensorCommand:
     def __init__(self, received_bytes):
+        if len(received_bytes) < _REPLY_VALUE.size:
+            self._decode_short(received_bytes)
+            return
+        self.type, self.mode, self.len, value = _REPLY_VALUE.unpack_from(received_bytes)
+        if self.mode == BmConst.Mode.VALUE:
+            self.value = value
+        elif self.mode in (BmConst.Mode.MIN, BmConst.Mode.MAX):
+            if len(received_bytes) < _REPLY_EXTREME_SIZE:
+                self._decode_short(received_bytes)
+                return
+            epoch = _REPLY_EPOCH.unpack_from(received_bytes, _REPLY_VALUE.size)[0]
+            if self.mode == BmConst.Mode.MIN:
+                self.minValue, self.minEpoch = value, epoch
+            else:
+                self.maxValue, self.maxEpoch = value, epoch
+
+    def _decode_short(self, received_bytes):
+        """Decode a truncated reply bit by bit, missing bits read as zero."""
         popv = CPopByteArray()
         popv.init(received_bytes)
         self.type = popv.popU08()
@@ -99,25 +195,77 @@ class BatmonSensorCommand:
             self.maxEpoch = popv.popU32()
 
 
-class CPPushByteArray:
-    def __init__(self):
-        self.data = bytearray()
-
-    def pushI08(self, value):
-        self.data.append(value & 0xff)
-
-    def pushI16(self, value):
-        self.pushI08(value & 0xff)
-        self.pushI08((value >> 8) & 0xff)
-
-    def pushI32(self, value):
-        self.pushI08(value & 0xff)
-        self.pushI08((value >> 8) & 0xff)
-        self.pushI08((value >> 16) & 0xff)
-        self.pushI08((value >> 24) & 0xff)
-
-    def getList(self):
-        return bytes(self.data)
+class SampleBarrier:
+    """Single-use rendezvous of the devices of a sync group.
+
+    Every device waits, connected, until all of them are connected or
+    ``timeout`` seconds have passed since the first one was, so their
+    first reads are taken together.
+    """
+
+    def __init__(self, parties: Iterable[str], timeout: float = SYNC_BARRIER_TIMEOUT) -> None:
+        self._waiting = set(parties)
+        self._timeout = timeout
+        self._released = asyncio.Event()
+        self._timer: asyncio.TimerHandle | None = None
+        self.released_at: float | None = None
+        if not self._waiting:
+            self._release()
+
+    async def wait(self, party: str) -> None:
+        """Arrive and wait for the others, at most until the timeout."""
+        if self._timer is None and not self._released.is_set():
+            self._timer = asyncio.get_running_loop().call_later(
+                self._timeout, self._release)
+        self.leave(party)
+        await self._released.wait()
+
+    def leave(self, party: str) -> None:
+        """Stop holding the others up, whether arrived or failed."""
+        self._waiting.discard(party)
+        if not self._waiting:
+            self._release()
+
+    def _release(self) -> None:
+        if self._released.is_set():
+            return
+        if self._waiting:
+            _LOGGER.debug("Sample barrier timed out waiting for %s", self._waiting)
+        if self._timer is not None:
+            self._timer.cancel()
+        self.released_at = time()
+        self._released.set()
+
+
+class LatencyTracker:
+    """Recent round-trip latencies of one device."""
+
+    def __init__(self, size: int = LATENCY_SAMPLES) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self.max_deadline: float = ROUND_TRIP_TIMEOUT_MAX
+        self.max_budget: float = UPDATE_TIMEOUT
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the given percentile, or None without enough history."""
+        if len(self._samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def deadline(self) -> float:
+        """Deadline for a single round trip."""
+        p95 = self.percentile(95)
+        if p95 is None:
+            return self.max_deadline
+        return min(max(p95 * ROUND_TRIP_DEADLINE_FACTOR, ROUND_TRIP_TIMEOUT_MIN),
+                   self.max_deadline)
+
+    def budget(self, round_trips: int) -> float:
+        """Overall budget for a sweep, never above max_budget."""
+        return min(round_trips * self.deadline(), self.max_budget)
 
 
 BATMON_SENSOR_MAPPING = [
@@ -133,6 +281,112 @@ BATMON_SENSOR_MAPPING = [
     ("amp_hours", BmConst.Type.BAT_AMPHOURS),
 ]
 
+# Volts and current go first so that they, and the watts computed from them,
+# are sampled as close together as possible (and to a sample barrier)
+_READ_ORDER = sorted(
+    BATMON_SENSOR_MAPPING, key=lambda item: item[0] not in ("volts", "current"))
+
+# Every key fetch_batmon_data can report
+BATMON_SENSOR_KEYS = [attr for attr, _ in BATMON_SENSOR_MAPPING] + ["watts"]
+
+# Mapping entries a reported key is computed from, if not just itself
+SENSOR_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "watts": ("volts", "current"),
+    "watt_hours": ("volts", "watt_hours"),
+    "state_of_charge": ("watt_hours", "state_of_charge"),
+    "amp_hours": ("watt_hours", "amp_hours"),
+}
+
+# Entries derived from the amp hours read by "watt_hours", no round trip
+_DERIVED_SENSORS = {"state_of_charge", "amp_hours"}
+
+
+def sensors_to_read(sensors) -> set[str]:
+    """Return the mapping entries needed to report the given keys."""
+    needed: set[str] = set()
+    for key in sensors:
+        needed.update(SENSOR_DEPENDENCIES.get(key, (key,)))
+    return needed
+
+
+_SNAPSHOT_SEQUENCE = count(1)
+
+
+@dataclass(frozen=True, slots=True)
+class BatMonSensors(Mapping[str, "float | bool | None"]):
+    """Immutable sensor readings of a BatMon.
+
+    Behaves as a read-only mapping of the keys that were read. Every
+    snapshot gets a new, increasing ``sequence`` so consumers can skip
+    work when nothing changed, and ``timestamps`` holds the wall-clock
+    time each key was acquired. Changes go through ``replace`` or
+    ``keep_newer``, which return a new snapshot.
+    """
+
+    volts: float | None = None
+    volts_ext: float | None = None
+    current: float | None = None
+    watts: float | None = None
+    int_temperature: float | None = None
+    ext_temperature: float | None = None
+    watt_hours: float | None = None
+    amp_hours: float | None = None
+    state_of_charge: float | None = None
+    relay_state: bool | None = None
+    switch_state: bool | None = None
+    timestamps: Mapping[str, float] = field(
+        default_factory=lambda: MappingProxyType({}))
+    sequence: int = field(default_factory=lambda: next(_SNAPSHOT_SEQUENCE))
+
+    @classmethod
+    def from_readings(
+        cls, readings: dict[str, float | bool | None], timestamps: dict[str, float]
+    ) -> BatMonSensors:
+        return cls(**readings, timestamps=MappingProxyType(timestamps))
+
+    def __getitem__(self, key: str) -> float | bool | None:
+        if key not in self.timestamps:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.timestamps)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def replace(
+        self, readings: dict[str, float | bool | None], timestamp: float | None = None
+    ) -> BatMonSensors:
+        """Return a copy with the given keys set, acquired at ``timestamp``."""
+        acquired = time() if timestamp is None else timestamp
+        return dataclasses.replace(
+            self,
+            **readings,
+            timestamps=MappingProxyType(
+                {**self.timestamps, **dict.fromkeys(readings, acquired)}),
+            sequence=next(_SNAPSHOT_SEQUENCE),
+        )
+
+    def keep_newer(self, previous: BatMonSensors) -> BatMonSensors:
+        """Take over readings of ``previous`` acquired after ours.
+
+        A sweep that read a pin before a switch command changed it must
+        not roll back the state the command confirmed.
+        """
+        newer = {
+            key: previous[key] for key, acquired in self.timestamps.items()
+            if previous.timestamps.get(key, acquired) > acquired
+        }
+        if not newer:
+            return self
+        timestamps = dict(self.timestamps)
+        timestamps.update((key, previous.timestamps[key]) for key in newer)
+        return dataclasses.replace(
+            self, **newer, timestamps=MappingProxyType(timestamps),
+            sequence=next(_SNAPSHOT_SEQUENCE))
+
+
 # class BatMonDeviceInfo:
 #     """Response data with information about the BatMon device without sensors."""
 #     def __init__(self, name: str, address: str = "", did_first_sync: bool = False):
@@ -157,12 +411,18 @@ class BatMonDevice():
             # Slice the string to remove the first three characters
             self.name = name[3:]
         self.address = address
-        self.sensors: dict[str, str | float | None] = {}
+        self.sensors = BatMonSensors()
 
     def friendly_name(self) -> str:
         """Generate a name for the device."""
         return self.name
 
+    def with_sensors(self, sensors: BatMonSensors) -> BatMonDevice:
+        """Return a copy of the device carrying other readings."""
+        device = copy(self)
+        device.sensors = sensors
+        return device
+
 
 class BatMonBluetoothDeviceData:
     """Data for BatMon BLE sensors."""
@@ -175,22 +435,65 @@ class BatMonBluetoothDeviceData:
         """Initialize the BatMon BLE sensor data object."""
         self.is_metric = is_metric
         self.max_attempts = max_attempts
+        self._session_lock = asyncio.Lock()
+        self._pending: list[
+            tuple[int, int, Callable[[BleakClient], Awaitable], asyncio.Future]
+        ] = []
+        self._pending_seq = count()
+        self.latency = LatencyTracker()
+        self.update_timeout: float = UPDATE_TIMEOUT
+        # 0 disconnects after every session
+        self.idle_timeout: float = 0
+        self.coalesce_window: float = COALESCE_WINDOW
+        # Polls that have not started reading yet, by what they read
+        self._polls: dict[tuple, asyncio.Future[BatMonDevice]] = {}
 
     def set_max_attempts(self, max_attempts: int) -> None:
         """Set the number of attempts."""
         self.max_attempts = max_attempts
 
+    def set_timeouts(self, update_timeout: float, round_trip_timeout: float) -> None:
+        """Set the connection timeout and the longest round-trip deadline."""
+        self.update_timeout = update_timeout
+        self.latency.max_budget = update_timeout
+        self.latency.max_deadline = round_trip_timeout
+
+    def set_idle_timeout(self, idle_timeout: float) -> None:
+        """Set how long a connection stays open after its last session."""
+        self.idle_timeout = idle_timeout
+
     async def fetch_batmon_sensor_data(self, client, sensor_type):
-        mode = BmConst.Mode.VALUE
-        raw = CPPushByteArray()
-        raw.pushI08(sensor_type)
-        raw.pushI08(mode)
-        raw.pushI08(0)
-        n = raw.getList()
-        await client.write_gatt_char(UUID_SENSORS_COMMAND, n, response=True)
-        data = await client.read_gatt_char(UUID_SENSORS_COMMAND)
+        data = await self._sensor_round_trip(
+            client, sensor_command(sensor_type, BmConst.Mode.VALUE))
         return BatmonSensorCommand(data)
 
+    async def _sensor_round_trip(self, client, command: bytes) -> bytearray:
+        """Write a sensor command and read the reply within a deadline.
+
+        A round trip that overruns the device's usual latency is retried
+        on its own rather than stalling the rest of the sweep.
+        """
+        for attempt in range(ROUND_TRIP_RETRIES + 1):
+            deadline = self.latency.deadline()
+            start = monotonic()
+            try:
+                async with asyncio_timeout(deadline):
+                    await client.write_gatt_char(UUID_SENSORS_COMMAND, command, response=True)
+                    data = await client.read_gatt_char(UUID_SENSORS_COMMAND)
+            except asyncio.TimeoutError:
+                # Count the overrun so a device that really got slower
+                # widens its deadline instead of failing every read
+                self.latency.add(deadline)
+                if attempt == ROUND_TRIP_RETRIES:
+                    raise
+                _LOGGER.debug(
+                    "Round trip to %s exceeded %.2fs, retrying", client.address, deadline)
+                continue
+            self.latency.add(monotonic() - start)
+            return data
+
+        raise RuntimeError("Should not reach this point")
+
     def calculate_state_of_charge(self, capacity, max_ah, amp_hours):
         tmp_ah = 0
         try:
@@ -206,26 +509,39 @@ class BatMonBluetoothDeviceData:
         return round(100 + (((amp_hours-tmp_ah) / capacity) * 100), 1)
 
     async def fetch_batmon_max_sensor_data(self, client, sensor_type):
-        mode = BmConst.Mode.MAX
-        raw = CPPushByteArray()
-        raw.pushI08(sensor_type)
-        raw.pushI08(mode)
-        raw.pushI08(0)
-        n = raw.getList()
-        await client.write_gatt_char(UUID_SENSORS_COMMAND, n, response=True)
-        data = await client.read_gatt_char(UUID_SENSORS_COMMAND)
+        data = await self._sensor_round_trip(
+            client, sensor_command(sensor_type, BmConst.Mode.MAX))
         return BatmonSensorCommand(data)
 
-    async def fetch_batmon_data(self, client, device, capacity, is_soc_required):
-        """Fetch sensor data for a specific BatMon device."""
+    async def fetch_batmon_data(self, client, device, capacity, is_soc_required, sensors=None):
+        """Fetch sensor data for a specific BatMon device.
+
+        ``sensors`` limits the reported keys, and the round trips made, to
+        the given ones. None reports everything.
+        """
         data = {}
+        timestamps: dict[str, float] = {}
         name = device.name
         amp_hours = None
+        amp_hours_at = None
         max_ah = None
-
-        for attr, sensor_type in BATMON_SENSOR_MAPPING:
+        wanted = set(BATMON_SENSOR_KEYS if sensors is None else sensors)
+        to_read = sensors_to_read(wanted)
+
+        for attr, sensor_type in _READ_ORDER:
+            if attr not in to_read:
+                continue
+            # Round-trip boundary: let queued commands use the connection.
+            # Queued polls wait for the end of the session, they would run
+            # a whole sweep inside this one's budget
+            if self._pending:
+                await self._run_pending(client, below=OperationPriority.POLL)
             try:
-                response = await self.fetch_batmon_sensor_data(client, sensor_type)
+                if attr not in _DERIVED_SENSORS:
+                    response = await self.fetch_batmon_sensor_data(client, sensor_type)
+                    read_at = time()
+                else:
+                    read_at = amp_hours_at if amp_hours_at is not None else time()
                 if attr in ["volts", "volts_ext", "int_temperature", "ext_temperature"]:
                     data[attr] = round(
                         response.value, 2) if response.value is not None else None
@@ -238,9 +554,12 @@ class BatMonBluetoothDeviceData:
                 elif attr in ["watt_hours"]:
                     amp_hours = round(
                         response.value, 2) if response.value is not None else None
-                    data[attr] = round(
-                        (amp_hours * data["volts"]), 2) if response.value is not None else None
-                    max_ah = await self.fetch_batmon_max_sensor_data(client, sensor_type)
+                    amp_hours_at = read_at
+                    if "state_of_charge" in wanted:
+                        max_ah = await self.fetch_batmon_max_sensor_data(client, sensor_type)
+                    if "volts" in to_read:
+                        data[attr] = round(
+                            (amp_hours * data["volts"]), 2) if response.value is not None else None
                 elif attr in ["relay_state", "switch_state"]:
                     data[attr] = bool(
                         response.value) if response.value is not None else None
@@ -254,24 +573,68 @@ class BatMonBluetoothDeviceData:
 
             except Exception as e:
                 _LOGGER.warning(f"Error fetching {attr} for {name}: {e}")
+            for key in data:
+                timestamps.setdefault(key, read_at)
 
-        return data
+        return BatMonSensors.from_readings(
+            {key: value for key, value in data.items() if key in wanted},
+            {key: value for key, value in timestamps.items() if key in wanted},
+        )
 
-    def _handle_disconnect(
-        self, disconnect_future: asyncio.Future[bool], client: BleakClient
-    ) -> None:
-        """Handle disconnect from device."""
-        _LOGGER.debug(f"Disconnected from:  {client.address}")
-        if not disconnect_future.done():
-            disconnect_future.set_result(True)
+    async def update_device(
+        self, ble_device: BLEDevice, is_soc_required, capacity, sensors=None,
+        barrier: SampleBarrier | None = None,
+    ) -> BatMonDevice:
+        """Connects to the device through BLE and retrieves relevant data
+
+        With a ``barrier`` the reads start once the rest of the sync group
+        is connected too. Callers asking for the same reads before an
+        earlier poll started reading share its result.
+        """
+        key = (is_soc_required, capacity,
+               None if sensors is None else tuple(sensors), barrier)
+        while (shared := self._polls.get(key)) is not None:
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+                # The poll we joined was cancelled, not us
 
-    async def update_device(self, ble_device: BLEDevice, is_soc_required, capacity) -> BatMonDevice:
-        """Connects to the device through BLE and retrieves relevant data"""
+        future: asyncio.Future[BatMonDevice] = asyncio.get_running_loop().create_future()
+        self._polls[key] = future
+        stop_sharing = partial(self._stop_sharing_poll, key, future)
+        try:
+            result = await self._update_device_with_retries(
+                ble_device, is_soc_required, capacity, sensors, barrier, stop_sharing)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as err:
+            future.set_exception(err)
+            # Nobody may have joined
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            stop_sharing()
+
+    def _stop_sharing_poll(self, key: tuple, future: asyncio.Future) -> None:
+        if self._polls.get(key) is future:
+            del self._polls[key]
+
+    async def _update_device_with_retries(
+        self, ble_device: BLEDevice, is_soc_required, capacity, sensors,
+        barrier: SampleBarrier | None, on_reading: Callable[[], None],
+    ) -> BatMonDevice:
         delay = 1
         for attempt in range(self.max_attempts):
             is_final_attempt = attempt == self.max_attempts - 1
             try:
-                return await self._update_device(ble_device, is_soc_required, capacity)
+                return await self._update_device(
+                    ble_device, is_soc_required, capacity, sensors, barrier, on_reading)
             except DisconnectedError:
                 if is_final_attempt:
                     raise
@@ -290,106 +653,189 @@ class BatMonBluetoothDeviceData:
 
         raise RuntimeError("Should not reach this point")
 
-    async def _update_device(self, ble_device: BLEDevice, is_soc_required, capacity) -> BatMonDevice:
+    async def _update_device(
+        self, ble_device: BLEDevice, is_soc_required, capacity, sensors=None,
+        barrier: SampleBarrier | None = None,
+        on_reading: Callable[[], None] | None = None,
+    ) -> BatMonDevice:
         """Connects to the device through BLE and retrieves relevant data"""
-        device = BatMonDevice(ble_device.name, ble_device.address)
-        loop = asyncio.get_running_loop()
-        disconnect_future = loop.create_future()
-        client: BleakClientWithServiceCache = (
-            await establish_connection(  # pylint: disable=line-too-long
-                BleakClientWithServiceCache,
-                ble_device,
-                ble_device.address,
-                disconnected_callback=partial(
-                    self._handle_disconnect, disconnect_future
-                ),
-            )
+        return await self._run_operation(
+            ble_device,
+            partial(self._poll_device, ble_device,
+                    is_soc_required=is_soc_required, capacity=capacity,
+                    sensors=sensors, barrier=barrier, on_reading=on_reading),
+            OperationPriority.POLL,
         )
-        try:
-            async with interrupt(
-                disconnect_future,
-                DisconnectedError,
-                f"Disconnected from {client.address}",
-            ), asyncio_timeout(UPDATE_TIMEOUT):
-                _LOGGER.debug(f"Connected to Device:  {device.address}")
-                device.sensors = await self.fetch_batmon_data(client, device, capacity, is_soc_required)
-        except BleakError as err:
-            if "not found" in str(err):  # In future bleak this is a named exception
-                # Clear the char cache since a char is likely
-                # missing from the cache
-                await client.clear_cache()
-            raise
-        except UnsupportedDeviceError:
-            await client.disconnect()
-            raise
-        finally:
-            await client.disconnect()
 
+    async def _poll_device(
+        self, ble_device: BLEDevice, client, is_soc_required, capacity, sensors=None,
+        barrier: SampleBarrier | None = None,
+        on_reading: Callable[[], None] | None = None,
+    ) -> BatMonDevice:
+        """Read the sensors over an open connection."""
+        device = BatMonDevice(ble_device.name, ble_device.address)
+        _LOGGER.debug(f"Connected to Device:  {device.address}")
+        if barrier is not None:
+            # Not part of the read budget, the wait is bounded by the barrier
+            await barrier.wait(device.address)
+        if on_reading is not None:
+            # Later callers would get readings taken before they asked
+            on_reading()
+        # One round trip per mapping entry read plus the max amp hours read
+        round_trips = len(sensors_to_read(
+            BATMON_SENSOR_KEYS if sensors is None else sensors) - _DERIVED_SENSORS) + 1
+        async with asyncio_timeout(self.latency.budget(round_trips)):
+            device.sensors = await self.fetch_batmon_data(
+                client, device, capacity, is_soc_required, sensors)
         return device
 
-    async def _set_batmon_switch(self, client, device, attr, turn_on):
-        int_value = 0
-        io_type = 2  # 3 == Switch. 2 == Relay
-        api_ref = 606
-        switch_type = BmConst.Type.RELAY_PIN
-        if attr == "switch_state":
-            switch_type = BmConst.Type.SWITCH_PIN
-            io_type = 3
-
-        if turn_on:
-            int_value = 1
-
-        raw = CPPushByteArray()
-        raw.pushI16(api_ref)
-        raw.pushI08(1)  # Next arg is a int32
-        raw.pushI32(io_type)
-        raw.pushI08(1)  # Next arg is a int32
-        raw.pushI32(int_value)
-        raw.pushI08(0)  # Null terminator
-        raw_list = raw.getList()
-
-        ret = await client.write_gatt_char(UUID_DEVICE_API, raw_list, response=True)
-        response = await self.fetch_batmon_sensor_data(client, switch_type)
-        new_state = bool(
-            response.value) if response.value is not None else None
-
-        return new_state
-
-    async def send_switch_command(self, ble_device: BLEDevice, attr, turn_on: bool):
-        """Send a command over Bluetooth to turn the relay or switch on or off."""
-        ret = False
-        device = BatMonDevice(ble_device.name, ble_device.address)
+    async def _run_operation(
+        self,
+        ble_device: BLEDevice,
+        operation: Callable[[BleakClient], Awaitable],
+        priority: OperationPriority,
+    ):
+        """Run an operation on the device, sharing any session already open.
+
+        While another session holds the connection the operation is queued
+        and runs at that session's next round-trip boundary, so a command
+        waits at most one sensor read instead of a whole sweep.
+        """
         loop = asyncio.get_running_loop()
-        disconnect_future = loop.create_future()
-        client: BleakClientWithServiceCache = (
-            await establish_connection(  # pylint: disable=line-too-long
-                BleakClientWithServiceCache,
-                ble_device,
-                ble_device.address,
-                disconnected_callback=partial(
-                    self._handle_disconnect, disconnect_future
-                ),
-            )
-        )
+        while self._session_lock.locked():
+            future = loop.create_future()
+            heappush(self._pending,
+                     (priority, next(self._pending_seq), operation, future))
+            try:
+                return await future
+            except _SessionClosed:
+                # The session ended first, open our own
+                continue
+
+        async with self._session(ble_device, priority) as client:
+            return await operation(client)
+
+    async def _run_pending(self, client, below: int | None = None) -> None:
+        """Run queued operations on the open connection, highest priority first.
+
+        With ``below`` only operations that outrank that priority are run.
+        """
+        while self._pending:
+            if below is not None and self._pending[0][0] >= below:
+                return
+            _, _, operation, future = heappop(self._pending)
+            if future.done():
+                # The waiter was cancelled
+                continue
+            try:
+                result = await operation(client)
+            except Exception as err:
+                if not future.done():
+                    future.set_exception(err)
+            except BaseException:
+                # Disconnect or timeout: let the waiter retry elsewhere
+                if not future.done():
+                    future.set_exception(_SessionClosed())
+                raise
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def _fail_pending(self) -> None:
+        """Hand queued operations back to their callers."""
+        while self._pending:
+            _, _, _, future = heappop(self._pending)
+            if not future.done():
+                future.set_exception(_SessionClosed())
+
+    @asynccontextmanager
+    async def _session(
+        self, ble_device: BLEDevice, priority: OperationPriority
+    ) -> AsyncIterator[BleakClient]:
+        """Hold the device connection exclusively, draining queued operations."""
+        async with self._session_lock:
+            try:
+                if self.coalesce_window > 0:
+                    # Let requests arriving right after this one queue up
+                    # and share the connection
+                    await asyncio.sleep(self.coalesce_window)
+                async with self._connect(ble_device, priority) as client:
+                    # Anything that queued up while connecting and outranks
+                    # the owner goes first
+                    await self._run_pending(client, below=priority)
+                    yield client
+                    await self._run_pending(client)
+            finally:
+                self._fail_pending()
+
+    @asynccontextmanager
+    async def _connect(
+        self, ble_device: BLEDevice, priority: OperationPriority = OperationPriority.POLL
+    ) -> AsyncIterator[BleakClient]:
+        """Borrow a pooled connection to the device for the duration of the context.
+
+        The connection goes back to the adapter's pool afterwards and stays
+        open for ``idle_timeout`` seconds if the session went well.
+        """
+        pool = connection_pool_for(ble_device)
+        connection = await pool.acquire(ble_device, priority)
+        client = connection.client
+        reusable = False
         try:
             async with interrupt(
-                disconnect_future,
+                connection.disconnected,
                 DisconnectedError,
                 f"Disconnected from {client.address}",
-            ), asyncio_timeout(UPDATE_TIMEOUT):
-                _LOGGER.debug(f"Sending relay switch command from:  {
-                              client.address}")
-                ret = await self._set_batmon_switch(client, device, attr, turn_on)
+            ), asyncio_timeout(self.update_timeout):
+                yield client
+            reusable = True
         except BleakError as err:
             if "not found" in str(err):  # In future bleak this is a named exception
                 # Clear the char cache since a char is likely
                 # missing from the cache
                 await client.clear_cache()
             raise
-        except UnsupportedDeviceError:
-            await client.disconnect()
-            raise
         finally:
-            await client.disconnect()
+            await pool.release(connection, self.idle_timeout if reusable else 0)
+
+    async def close(self, ble_device: BLEDevice) -> None:
+        """Close the idle pooled connection to the device, if any."""
+        await connection_pool_for(ble_device).close(ble_device.address)
+
+    async def _call_device_api(self, client, calls: Sequence[ApiCall]) -> list[Any]:
+        """Write device API calls back to back, then read back their results.
+
+        A sensor confirming several calls is read once, after the last of
+        them was written.
+        """
+        for call in calls:
+            await client.write_gatt_char(UUID_DEVICE_API, call.frame, response=True)
+        readings: dict[int, BatmonSensorCommand] = {}
+        results = []
+        for call in calls:
+            if call.readback is None:
+                results.append(None)
+                continue
+            if (response := readings.get(call.readback)) is None:
+                response = readings[call.readback] = await self.fetch_batmon_sensor_data(
+                    client, call.readback)
+            results.append(call.method.decode(response.value))
+        return results
+
+    async def call_device_api(self, ble_device: BLEDevice, *calls: ApiCall) -> list[Any]:
+        """Make device API calls in one go and return their results in order.
+
+        Like a switch command, the calls preempt a poll holding the connection.
+        """
+        return await self._run_operation(
+            ble_device, partial(self._call_device_api, calls=calls),
+            OperationPriority.COMMAND)
+
+    async def send_switch_command(self, ble_device: BLEDevice, attr, turn_on: bool):
+        """Send a command over Bluetooth to turn the relay or switch on or off.
 
-        return ret
+        If a poll is connected the command preempts it at the next read.
+        """
+        _LOGGER.debug(f"Sending {attr} switch command to:  {ble_device.address}")
+        (new_state,) = await self.call_device_api(ble_device, set_switch(attr, turn_on))
+        return new_state
@@ -6,19 +6,43 @@ import dataclasses
 import logging
 from typing import Any
 
-from bleak import BleakError
 import voluptuous as vol
 
-from homeassistant.components import bluetooth
 from homeassistant.components.bluetooth import (
     BluetoothServiceInfo,
     async_discovered_service_info,
 )
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
-from homeassistant.const import CONF_ADDRESS
-
-from .const import DOMAIN
-from .batmon import BatMonBluetoothDeviceData, BatMonDevice
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.const import CONF_ADDRESS, CONF_SCAN_INTERVAL
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    CONF_BATTERY_CAPACITY,
+    CONF_CONNECTION_IDLE_TIMEOUT,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_ATTEMPTS,
+    CONF_ROUND_TRIP_TIMEOUT,
+    CONF_SENSORS,
+    CONF_STATE_OF_CHARGE_REQUIRED,
+    CONF_SYNC_GROUP,
+    CONF_UPDATE_TIMEOUT,
+    DEFAULT_CONNECTION_IDLE_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    MAX_RETRIES_AFTER_STARTUP,
+    MFCT_ID,
+    MIN_SCAN_INTERVAL,
+    ROUND_TRIP_TIMEOUT_MAX,
+    ROUND_TRIP_TIMEOUT_MIN,
+    UPDATE_TIMEOUT,
+)
+from .batmon import BATMON_SENSOR_KEYS, BatMonDevice
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,58 +64,48 @@ def get_name(device: BatMonDevice) -> str:
     return device.friendly_name()
 
 
-class BatMonDeviceUpdateError(Exception):
-    """Custom error class for device updates."""
+def is_batmon(discovery_info: BluetoothServiceInfo) -> bool:
+    """Whether the advertisement is a BatMon's."""
+    return MFCT_ID in discovery_info.manufacturer_data or any(
+        uuid in SERVICE_UUIDS for uuid in discovery_info.service_uuids)
+
+
+def device_from_advertisement(discovery_info: BluetoothServiceInfo) -> BatMonDevice:
+    """Identify a BatMon from its advertisement, without connecting to it."""
+    name = discovery_info.name
+    if not name or name.replace("-", ":") == discovery_info.address:
+        # Nothing but the address was advertised
+        name = f"BatMon {discovery_info.address[-5:].replace(':', '')}"
+    return BatMonDevice(name, discovery_info.address)
 
 
 class BatMonConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for BatMon BLE."""
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return BatMonOptionsFlow()
+
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._discovered_device: Discovery | None = None
         self._discovered_devices: dict[str, Discovery] = {}
 
-    async def _get_device_data(
-        self, discovery_info: BluetoothServiceInfo
-    ) -> BatMonDevice:
-        ble_device = bluetooth.async_ble_device_from_address(
-            self.hass, discovery_info.address
-        )
-        if ble_device is None:
-            _LOGGER.debug("No BLE device in _get_device_data")
-            raise BatMonDeviceUpdateError("No BLE device")
-
-        BatMon = BatMonBluetoothDeviceData()
-        try:
-            data = await BatMon.update_device(ble_device, False, "0")
-        except BleakError as err:
-            _LOGGER.error(
-                "Error connecting to and getting data from %s: %s", discovery_info.address, err)
-            raise BatMonDeviceUpdateError(
-                "Failed getting device data") from err
-        except Exception as err:
-            _LOGGER.error("Unknown error occurred from %s: %s",
-                          discovery_info.address, err)
-            raise
-        return data
-
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfo
     ) -> ConfigFlowResult:
         """Handle the Bluetooth discovery step."""
         _LOGGER.debug("Discovered BT device: %s", discovery_info)
+        # Repeated advertisements of a device abort as already in progress
         await self.async_set_unique_id(discovery_info.address)
         self._abort_if_unique_id_configured()
+        if not is_batmon(discovery_info):
+            return self.async_abort(reason="not_supported")
 
-        try:
-            device = await self._get_device_data(discovery_info)
-        except BatMonDeviceUpdateError:
-            return self.async_abort(reason="cannot_connect")
-        except Exception:
-            return self.async_abort(reason="unknown")
-
+        device = device_from_advertisement(discovery_info)
         name = get_name(device)
         self.context["title_placeholders"] = {"name": name}
         self._discovered_device = Discovery(name, discovery_info, device)
@@ -111,8 +125,8 @@ class BatMonConfigFlow(ConfigFlow, domain=DOMAIN):
 
         # Create the form for user input
         data_schema = vol.Schema({
-            vol.Required("state_of_charge_required", default=False): bool,
-            vol.Optional("battery_capacity", default=""): str,
+            vol.Required(CONF_STATE_OF_CHARGE_REQUIRED, default=False): bool,
+            vol.Optional(CONF_BATTERY_CAPACITY, default=""): str,
         })
 
         return self.async_show_form(
@@ -142,16 +156,10 @@ class BatMonConfigFlow(ConfigFlow, domain=DOMAIN):
             if address in current_addresses or address in self._discovered_devices:
                 continue
 
-            if not any(uuid in SERVICE_UUIDS for uuid in discovery_info.service_uuids):
-                continue
-
-            try:
-                device = await self._get_device_data(discovery_info)
-            except BatMonDeviceUpdateError:
-                continue
-            except Exception:
+            if not is_batmon(discovery_info):
                 continue
 
+            device = device_from_advertisement(discovery_info)
             name = get_name(device)
             self._discovered_devices[address] = Discovery(
                 name, discovery_info, device)
@@ -166,3 +174,68 @@ class BatMonConfigFlow(ConfigFlow, domain=DOMAIN):
             data_schema=vol.Schema(
                 {vol.Required(CONF_ADDRESS): vol.In(titles)}),
         )
+
+
+class BatMonOptionsFlow(OptionsFlow):
+    """Retune polling of a BatMon, applied without reloading the entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            # A cleared text field is left out of the submission
+            user_input.setdefault(CONF_BATTERY_CAPACITY, "")
+            user_input.setdefault(CONF_SYNC_GROUP, "")
+            return self.async_create_entry(data=user_input)
+
+        data = self.config_entry.data
+        options = self.config_entry.options
+        data_schema = vol.Schema({
+            vol.Required(
+                CONF_SCAN_INTERVAL,
+                default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)),
+            vol.Required(
+                CONF_MAX_ATTEMPTS,
+                default=options.get(CONF_MAX_ATTEMPTS, MAX_RETRIES_AFTER_STARTUP),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+            vol.Required(
+                CONF_UPDATE_TIMEOUT,
+                default=options.get(CONF_UPDATE_TIMEOUT, UPDATE_TIMEOUT),
+            ): vol.All(vol.Coerce(float), vol.Range(min=5, max=120)),
+            vol.Required(
+                CONF_ROUND_TRIP_TIMEOUT,
+                default=options.get(CONF_ROUND_TRIP_TIMEOUT, ROUND_TRIP_TIMEOUT_MAX),
+            ): vol.All(vol.Coerce(float), vol.Range(min=ROUND_TRIP_TIMEOUT_MIN, max=30)),
+            vol.Required(
+                CONF_CONNECTION_IDLE_TIMEOUT,
+                default=options.get(
+                    CONF_CONNECTION_IDLE_TIMEOUT, DEFAULT_CONNECTION_IDLE_TIMEOUT),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+            vol.Required(
+                CONF_STATE_OF_CHARGE_REQUIRED,
+                default=options.get(
+                    CONF_STATE_OF_CHARGE_REQUIRED,
+                    data.get(CONF_STATE_OF_CHARGE_REQUIRED, False)),
+            ): bool,
+            vol.Optional(
+                CONF_BATTERY_CAPACITY,
+                description={"suggested_value": options.get(
+                    CONF_BATTERY_CAPACITY, data.get(CONF_BATTERY_CAPACITY))},
+            ): str,
+            vol.Required(
+                CONF_SENSORS,
+                default=options.get(CONF_SENSORS, BATMON_SENSOR_KEYS),
+            ): cv.multi_select({key: key for key in BATMON_SENSOR_KEYS}),
+            vol.Required(
+                CONF_IMPORT_STATISTICS,
+                default=options.get(CONF_IMPORT_STATISTICS, False),
+            ): bool,
+            vol.Optional(
+                CONF_SYNC_GROUP,
+                description={"suggested_value": options.get(CONF_SYNC_GROUP)},
+            ): str,
+        })
+
+        return self.async_show_form(step_id="init", data_schema=data_schema)
@@ -0,0 +1,230 @@
+"""Per-adapter pool of BatMon connections.
+
+Adapters and proxies only hold a few connections at a time. Every
+BatMonBluetoothDeviceData connects through the pool of the adapter that
+reaches its device, so hot devices can stay connected between polls while
+idle ones are closed, or evicted when another device needs the slot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+from time import monotonic
+from typing import Any
+
+from bleak import BleakClient
+from bleak.backends.device import BLEDevice
+from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
+
+from .const import MAX_CONNECTIONS_PER_ADAPTER
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_ADAPTER = "default"
+
+
+class PooledConnection:
+    """A connection to one device, owned by at most one session at a time."""
+
+    __slots__ = (
+        "address", "client", "disconnected", "priority", "in_use",
+        "last_used", "idle_timer",
+    )
+
+    def __init__(self, address: str, priority: int) -> None:
+        self.address = address
+        self.client: BleakClientWithServiceCache | None = None
+        self.disconnected: asyncio.Future[bool] = (
+            asyncio.get_running_loop().create_future())
+        self.priority = priority
+        self.in_use = True
+        self.last_used = monotonic()
+        self.idle_timer: asyncio.TimerHandle | None = None
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.client is not None
+            and self.client.is_connected
+            and not self.disconnected.done()
+        )
+
+
+class BatMonConnectionPool:
+    """Bounded, LRU-evicting set of connections on one adapter."""
+
+    def __init__(self, adapter: str, max_connections: int = MAX_CONNECTIONS_PER_ADAPTER) -> None:
+        self.adapter = adapter
+        self.max_connections = max_connections
+        self._connections: dict[str, PooledConnection] = {}
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.idle_closes = 0
+
+    async def acquire(self, ble_device: BLEDevice, priority: int) -> PooledConnection:
+        """Return a connection to the device, reusing an idle one if possible.
+
+        Waits for a free slot when every connection is in use. A lower
+        ``priority`` value marks the connection as more important to keep.
+        """
+        address = ble_device.address
+        while True:
+            connection = self._connections.get(address)
+            if connection is not None and not connection.in_use:
+                if connection.is_alive:
+                    self.hits += 1
+                    self._take(connection, priority)
+                    return connection
+                await self._close(connection)
+                continue
+            if connection is None:
+                if len(self._connections) < self.max_connections:
+                    break
+                # Another caller may take the freed slot while the victim
+                # disconnects, so look at the pool again
+                if await self._evict():
+                    continue
+            await self._wait()
+
+        self.misses += 1
+        connection = PooledConnection(address, priority)
+        self._connections[address] = connection
+        try:
+            connection.client = await establish_connection(
+                BleakClientWithServiceCache,
+                ble_device,
+                address,
+                disconnected_callback=lambda client: self._on_disconnect(
+                    connection, client),
+            )
+        except BaseException:
+            del self._connections[address]
+            self._wake()
+            raise
+        return connection
+
+    async def release(self, connection: PooledConnection, idle_timeout: float) -> None:
+        """Hand a connection back, keeping it open for ``idle_timeout`` seconds."""
+        connection.in_use = False
+        connection.last_used = monotonic()
+        if idle_timeout <= 0 or not connection.is_alive:
+            await self._close(connection)
+            return
+        connection.idle_timer = asyncio.get_running_loop().call_later(
+            idle_timeout, self._idle_expired, connection)
+        self._wake()
+
+    async def close(self, address: str) -> None:
+        """Close the connection to a device unless a session is using it."""
+        connection = self._connections.get(address)
+        if connection is not None and not connection.in_use:
+            await self._close(connection)
+
+    def stats(self) -> dict[str, Any]:
+        """Usage counters of the pool."""
+        requests = self.hits + self.misses
+        return {
+            "adapter": self.adapter,
+            "max_connections": self.max_connections,
+            "connections": len(self._connections),
+            "in_use": sum(c.in_use for c in self._connections.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 3) if requests else None,
+            "evictions": self.evictions,
+            "idle_closes": self.idle_closes,
+        }
+
+    def _take(self, connection: PooledConnection, priority: int) -> None:
+        if connection.idle_timer is not None:
+            connection.idle_timer.cancel()
+            connection.idle_timer = None
+        connection.in_use = True
+        connection.priority = priority
+
+    async def _evict(self) -> bool:
+        """Close the idle connection that is least worth keeping."""
+        idle = [c for c in self._connections.values() if not c.in_use]
+        if not idle:
+            return False
+        # Lowest priority first, then least recently used
+        victim = max(idle, key=lambda c: (c.priority, -c.last_used))
+        _LOGGER.debug("Evicting connection to %s from %s",
+                      victim.address, self.adapter)
+        self.evictions += 1
+        await self._close(victim)
+        return True
+
+    async def _close(self, connection: PooledConnection) -> None:
+        if self._connections.get(connection.address) is connection:
+            del self._connections[connection.address]
+        if connection.idle_timer is not None:
+            connection.idle_timer.cancel()
+            connection.idle_timer = None
+        try:
+            if connection.client is not None:
+                await connection.client.disconnect()
+        finally:
+            self._wake()
+
+    def _idle_expired(self, connection: PooledConnection) -> None:
+        connection.idle_timer = None
+        if connection.in_use or self._connections.get(connection.address) is not connection:
+            return
+        self.idle_closes += 1
+        asyncio.get_running_loop().create_task(self._close(connection))
+
+    def _on_disconnect(self, connection: PooledConnection, client: BleakClient) -> None:
+        """Handle disconnect from device."""
+        _LOGGER.debug(f"Disconnected from:  {client.address}")
+        if not connection.disconnected.done():
+            connection.disconnected.set_result(True)
+        if not connection.in_use and self._connections.get(connection.address) is connection:
+            del self._connections[connection.address]
+            if connection.idle_timer is not None:
+                connection.idle_timer.cancel()
+                connection.idle_timer = None
+            self._wake()
+
+    async def _wait(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _wake(self) -> None:
+        """Let every waiter look at the pool again."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+_POOLS: dict[str, BatMonConnectionPool] = {}
+
+
+def adapter_of(ble_device: BLEDevice) -> str:
+    """Name of the adapter or proxy that reaches a device."""
+    details = ble_device.details
+    if isinstance(details, dict):
+        if source := details.get("source"):
+            return source
+        # BlueZ object path: /org/bluez/hci0/dev_AA_BB_...
+        if (path := details.get("path")) and path.count("/") >= 4:
+            return path.split("/")[3]
+    return DEFAULT_ADAPTER
+
+
+def connection_pool_for(ble_device: BLEDevice) -> BatMonConnectionPool:
+    """Return the shared pool of the adapter that reaches a device."""
+    adapter = adapter_of(ble_device)
+    if (pool := _POOLS.get(adapter)) is None:
+        pool = _POOLS[adapter] = BatMonConnectionPool(adapter)
+    return pool
@@ -4,6 +4,7 @@ DOMAIN = "batmon_bm"
 MFCT_ID = 4077
 
 DEFAULT_SCAN_INTERVAL = 60
+MIN_SCAN_INTERVAL = 5
 
 MAX_RETRIES_AFTER_STARTUP = 5
 
@@ -11,5 +12,49 @@ DEFAULT_MAX_UPDATE_ATTEMPTS = 3
 
 UPDATE_TIMEOUT = 30
 
+# Config entry data
+CONF_STATE_OF_CHARGE_REQUIRED = "state_of_charge_required"
+CONF_BATTERY_CAPACITY = "battery_capacity"
+
+# Options, applied by the coordinator without reloading the entry
+CONF_MAX_ATTEMPTS = "max_attempts"
+CONF_UPDATE_TIMEOUT = "update_timeout"
+CONF_ROUND_TRIP_TIMEOUT = "round_trip_timeout"
+CONF_SENSORS = "sensors"
+CONF_IMPORT_STATISTICS = "import_statistics"
+CONF_CONNECTION_IDLE_TIMEOUT = "connection_idle_timeout"
+CONF_SYNC_GROUP = "sync_group"
+
+# Per round trip (sensor command write + read) deadlines, derived from the
+# latency history of each device and clamped to these bounds
+ROUND_TRIP_TIMEOUT_MIN = 0.5
+ROUND_TRIP_TIMEOUT_MAX = 5
+ROUND_TRIP_DEADLINE_FACTOR = 3
+ROUND_TRIP_RETRIES = 1
+LATENCY_SAMPLES = 50
+LATENCY_MIN_SAMPLES = 5
+
+# Simultaneous connections kept by the connection pool of one Bluetooth
+# adapter or proxy, shared by every BatMon it reaches
+MAX_CONNECTIONS_PER_ADAPTER = 3
+# Seconds a connection stays open after its last session, 0 disconnects
+# after every poll
+DEFAULT_CONNECTION_IDLE_TIMEOUT = 0
+
+# Seconds a new connection session waits for more reads and commands to
+# share it before connecting
+COALESCE_WINDOW = 0.05
+
+# Longest wait, after the first device of a sync group connected, for the
+# others before the group's reads start anyway
+SYNC_BARRIER_TIMEOUT = 5
+
+SERVICE_SET_SWITCHES = "set_switches"
+SERVICE_PROFILE = "profile"
+
+# Profile service modes
+PROFILE_MODE_SAMPLE = "sample"
+PROFILE_MODE_DETERMINISTIC = "deterministic"
+
 UUID_SENSORS_COMMAND = "00000303-8e22-4541-9d4c-21edae82ed19"
 UUID_DEVICE_API = "00000105-8e22-4541-9d4c-21edae82ed19"
\ No newline at end of file
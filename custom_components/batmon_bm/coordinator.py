@@ -3,21 +3,49 @@
 from __future__ import annotations
 
 from datetime import timedelta
+from importlib import import_module
 import logging
 
 from bleak.backends.device import BLEDevice
-from .batmon import BatMonBluetoothDeviceData, BatMonDevice
+from .batmon import (
+    BATMON_SENSOR_KEYS,
+    BatMonBluetoothDeviceData,
+    BatMonDevice,
+    SampleBarrier,
+)
 from bleak_retry_connector import close_stale_connections_by_address
-from typing import TypeAlias
+from typing import TYPE_CHECKING, TypeAlias
 
 from homeassistant.components import bluetooth
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
+from .const import (
+    CONF_BATTERY_CAPACITY,
+    CONF_CONNECTION_IDLE_TIMEOUT,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_ATTEMPTS,
+    CONF_ROUND_TRIP_TIMEOUT,
+    CONF_SENSORS,
+    CONF_STATE_OF_CHARGE_REQUIRED,
+    CONF_SYNC_GROUP,
+    CONF_UPDATE_TIMEOUT,
+    DEFAULT_CONNECTION_IDLE_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    MAX_RETRIES_AFTER_STARTUP,
+    ROUND_TRIP_TIMEOUT_MAX,
+    UPDATE_TIMEOUT,
+)
+from .sync_group import SyncGroup, async_get_sync_group
+
+if TYPE_CHECKING:
+    from .long_term_stats import StatisticsBuffer
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,18 +58,8 @@ class BatMonBLEDataUpdateCoordinator(DataUpdateCoordinator[BatMonDevice]):
 
     def __init__(self, hass: HomeAssistant, entry: BatMonBLEConfigEntry) -> None:
         """Initialize the coordinator."""
-        self.state_of_charge_required = entry.data.get(
-            "state_of_charge_required", False)
-        self.battery_capacity = entry.data.get("battery_capacity", None)
-
-        _LOGGER.debug(
-            "Setting up BatMon BLE: State of Charge Required = %s, Battery Capacity = %s",
-            self.state_of_charge_required,
-            self.battery_capacity,
-        )
-
         self.batmon = BatMonBluetoothDeviceData(
-            _LOGGER, hass.config.units is METRIC_SYSTEM
+            hass.config.units is METRIC_SYSTEM
         )
         super().__init__(
             hass,
@@ -50,6 +68,149 @@ class BatMonBLEDataUpdateCoordinator(DataUpdateCoordinator[BatMonDevice]):
             name=DOMAIN,
             update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
         )
+        self.address = entry.unique_id
+        self.statistics: StatisticsBuffer | None = None
+        entry.async_on_unload(self._async_stop_statistics)
+        self.sync_group: SyncGroup | None = None
+        self._barrier: SampleBarrier | None = None
+        entry.async_on_unload(self._async_leave_sync_group)
+        self.async_apply_options(startup=True)
+
+    @callback
+    def async_apply_options(self, startup: bool = False) -> None:
+        """Apply the entry options, taking effect from the next refresh.
+
+        Until the first refresh succeeded the default number of attempts
+        is kept so a missing device does not delay Home Assistant startup.
+        """
+        entry = self.config_entry
+        options = entry.options
+        self.state_of_charge_required = options.get(
+            CONF_STATE_OF_CHARGE_REQUIRED,
+            entry.data.get(CONF_STATE_OF_CHARGE_REQUIRED, False))
+        self.battery_capacity = options.get(
+            CONF_BATTERY_CAPACITY, entry.data.get(CONF_BATTERY_CAPACITY, None))
+        # None reads every sensor
+        self._configured_sensors: list[str] | None = options.get(CONF_SENSORS)
+        self._async_update_read_plan()
+
+        self.scan_interval = timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
+        self.batmon.set_timeouts(
+            options.get(CONF_UPDATE_TIMEOUT, UPDATE_TIMEOUT),
+            options.get(CONF_ROUND_TRIP_TIMEOUT, ROUND_TRIP_TIMEOUT_MAX),
+        )
+        self.batmon.set_idle_timeout(options.get(
+            CONF_CONNECTION_IDLE_TIMEOUT, DEFAULT_CONNECTION_IDLE_TIMEOUT))
+        if not startup:
+            self.batmon.set_max_attempts(
+                options.get(CONF_MAX_ATTEMPTS, MAX_RETRIES_AFTER_STARTUP))
+
+        self._import_statistics = options.get(CONF_IMPORT_STATISTICS, False)
+        if self._import_statistics:
+            if self.statistics is None:
+                entry.async_create_task(self.hass, self._async_start_statistics())
+        else:
+            self._async_stop_statistics()
+
+        # Join the sync group only once the first refresh is done, the
+        # group's timer then takes over from the coordinator's own
+        group_name = options.get(CONF_SYNC_GROUP) or None
+        if self.sync_group is not None and self.sync_group.name != group_name:
+            self._async_leave_sync_group()
+        if group_name is not None and not startup:
+            self.sync_group = async_get_sync_group(self.hass, group_name)
+            self.sync_group.async_add(self)
+        was_polling = self.update_interval is not None
+        self.update_interval = None if self.sync_group else self.scan_interval
+        # The update_interval setter neither schedules nor cancels refreshes
+        if was_polling and self.sync_group is not None:
+            self._unschedule_refresh()
+        elif not was_polling and self.sync_group is None and not startup:
+            # The group's timer no longer refreshes this device
+            self._schedule_refresh()
+
+        _LOGGER.debug(
+            "Setting up BatMon BLE: State of Charge Required = %s, Battery Capacity = %s",
+            self.state_of_charge_required,
+            self.battery_capacity,
+        )
+
+    async def _async_start_statistics(self) -> None:
+        """Start importing statistics, loading the recorder helpers off the loop."""
+        long_term_stats = await self.hass.async_add_import_executor_job(
+            import_module, f"{__package__}.long_term_stats")
+        if self.statistics is None and self._import_statistics:
+            entry = self.config_entry
+            self.statistics = long_term_stats.StatisticsBuffer(
+                self.hass, entry.unique_id, entry.title)
+            self.statistics.async_start()
+
+    @callback
+    def _async_stop_statistics(self) -> None:
+        self._import_statistics = False
+        if self.statistics is not None:
+            self.statistics.async_stop()
+            self.statistics = None
+
+    @callback
+    def _async_leave_sync_group(self) -> None:
+        if self.sync_group is not None:
+            self.sync_group.async_remove(self)
+            self.sync_group = None
+
+    async def async_refresh_synchronized(self, barrier: SampleBarrier) -> None:
+        """Refresh with the first reads held back by the group's barrier."""
+        self._barrier = barrier
+        try:
+            await self.async_refresh()
+        finally:
+            self._barrier = None
+            # Failed or skipped refreshes must not hold up the rest
+            barrier.leave(self.ble_device.address)
+
+    @callback
+    def _async_update_read_plan(self, event: Event | None = None) -> None:
+        """Read only the sensors that are configured and have an enabled entity.
+
+        Before the platforms have registered any entity everything
+        configured is read.
+        """
+        entry = self.config_entry
+        registry_entries = er.async_entries_for_config_entry(
+            er.async_get(self.hass), entry.entry_id)
+        sensors = self._configured_sensors
+        if registry_entries:
+            prefix = f"{entry.unique_id}_"
+            enabled = {
+                registry_entry.unique_id.removeprefix(prefix)
+                for registry_entry in registry_entries
+                if not registry_entry.disabled
+            }
+            sensors = [
+                key for key in (BATMON_SENSOR_KEYS if sensors is None else sensors)
+                if key in enabled
+            ]
+        # None reads every sensor
+        self.sensors: list[str] | None = sensors
+        # Removed entities are gone from the registry by the time the
+        # event arrives, remember ours to still recognize them
+        self._entity_ids = {
+            registry_entry.entity_id for registry_entry in registry_entries}
+
+    @callback
+    def _async_is_own_registry_event(
+        self, event_data: er.EventEntityRegistryUpdatedData
+    ) -> bool:
+        """Whether a registry update concerns an entity of this entry."""
+        entity_id = event_data["entity_id"]
+        if entity_id in self._entity_ids:
+            return True
+        registry_entry = er.async_get(self.hass).async_get(entity_id)
+        return (
+            registry_entry is not None
+            and registry_entry.config_entry_id == self.config_entry.entry_id
+        )
 
     async def _async_setup(self) -> None:
         """Set up the coordinator."""
@@ -57,6 +218,14 @@ class BatMonBLEDataUpdateCoordinator(DataUpdateCoordinator[BatMonDevice]):
 
         assert address is not None
 
+        self.config_entry.async_on_unload(
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+                self._async_update_read_plan,
+                event_filter=self._async_is_own_registry_event,
+            )
+        )
+
         await close_stale_connections_by_address(address)
 
         ble_device = bluetooth.async_ble_device_from_address(
@@ -68,14 +237,71 @@ class BatMonBLEDataUpdateCoordinator(DataUpdateCoordinator[BatMonDevice]):
             )
         self.ble_device = ble_device
 
+    async def async_shutdown(self) -> None:
+        """Close the pooled connection on unload instead of letting it idle out."""
+        await super().async_shutdown()
+        if (ble_device := getattr(self, "ble_device", None)) is not None:
+            await self.batmon.close(ble_device)
+
     async def _async_update_data(self) -> BatMonDevice:
         """Get data from Batmon BLE."""
+        if self.sensors is not None and not self.sensors:
+            # Every entity is disabled, nothing to connect for
+            return BatMonDevice(self.ble_device.name, self.ble_device.address)
         try:
-            data = await self.batmon.update_device(self.ble_device, self.state_of_charge_required, self.battery_capacity)
+            data = await self.batmon.update_device(
+                self.ble_device, self.state_of_charge_required, self.battery_capacity,
+                self.sensors, self._barrier)
         except Exception as err:
             raise UpdateFailed(f"Unable to fetch data: {err}") from err
 
+        if self.data is not None:
+            # A switch command may have confirmed a pin state after
+            # this sweep read it
+            data.sensors = data.sensors.keep_newer(self.data.sensors)
+        if self.statistics is not None:
+            self.statistics.async_add(data.sensors)
         return data
 
+    async def async_send_switch_command(self, attr: str, turn_on: bool) -> bool | None:
+        """Switch the relay or switch pin and publish the confirmed state."""
+        address = self.config_entry.unique_id
+
+        assert address is not None
+
+        ble_device = bluetooth.async_ble_device_from_address(
+            self.hass, address)
+
+        if not ble_device:
+            raise HomeAssistantError(
+                f"Could not find Batmon device with address {address}"
+            )
+        # Goes through the shared device data so the command shares
+        # (and preempts) any poll that currently holds the connection
+        state = await self.batmon.send_switch_command(ble_device, attr, turn_on)
+        # Copy on write, a refresh may be holding the current snapshot
+        self.data = self.data.with_sensors(
+            self.data.sensors.replace({attr: state}))
+        self.async_update_listeners()
+        return state
+
 
 BatMonBLEConfigEntry: TypeAlias = ConfigEntry[BatMonBLEDataUpdateCoordinator]
+
+
+@callback
+def async_get_coordinator_for_device(
+    hass: HomeAssistant, device_id: str
+) -> BatMonBLEDataUpdateCoordinator | None:
+    """Find the loaded coordinator of a BatMon device."""
+    device = dr.async_get(hass).async_get(device_id)
+    if device is not None:
+        for entry_id in device.config_entries:
+            entry = hass.config_entries.async_get_entry(entry_id)
+            if (
+                entry is not None
+                and entry.domain == DOMAIN
+                and entry.state is ConfigEntryState.LOADED
+            ):
+                return entry.runtime_data
+    return None
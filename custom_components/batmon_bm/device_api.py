@@ -0,0 +1,89 @@
+"""Typed calls of the BatMon device API and the sensor command frames.
+
+A device API frame is the little-endian ``u16`` API number, each argument
+as a one byte type tag followed by its value, and a zero terminator. The
+layout of every method is compiled once and the frames of the argument
+combinations seen so far are cached, so a call allocates nothing new.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from enum import IntEnum
+from functools import lru_cache
+from struct import Struct
+from typing import Any, NamedTuple
+
+# Argument combinations whose frames are kept, per method
+FRAME_CACHE_SIZE = 32
+
+_SENSOR_COMMAND = Struct("<BBB")
+
+
+class ArgType(IntEnum):
+    """Tag written before each argument of a device API frame."""
+    END = 0
+    I32 = 1
+
+
+class ApiCall(NamedTuple):
+    """An encoded device API call, ready to be written."""
+    method: ApiMethod
+    frame: bytes
+    # Sensor type read back to confirm the call, if any
+    readback: int | None
+
+
+class ApiMethod:
+    """One device API method with its frame layout compiled."""
+
+    __slots__ = ("name", "api_ref", "arg_names", "_struct", "_frames",
+                 "_readback", "_decode")
+
+    def __init__(
+        self,
+        name: str,
+        api_ref: int,
+        arg_names: tuple[str, ...],
+        readback: Callable[..., int | None] | None = None,
+        decode: Callable[[float | None], Any] | None = None,
+    ) -> None:
+        """``readback`` maps the arguments to the sensor that confirms the
+        call and ``decode`` turns that sensor's value into the result."""
+        self.name = name
+        self.api_ref = api_ref
+        self.arg_names = arg_names
+        self._struct = Struct("<H" + "Bi" * len(arg_names) + "B")
+        self._frames: dict[tuple[int, ...], bytes] = {}
+        self._readback = readback
+        self._decode = decode
+
+    def encode(self, *args: int) -> bytes:
+        """Return the frame of a call, from the cache if it was seen before."""
+        frame = self._frames.get(args)
+        if frame is None:
+            if len(args) != len(self.arg_names):
+                raise TypeError(
+                    f"{self.name} takes {len(self.arg_names)} arguments, got {len(args)}")
+            values: list[int] = [self.api_ref]
+            for arg in args:
+                values += (ArgType.I32, arg)
+            values.append(ArgType.END)
+            frame = self._struct.pack(*values)
+            if len(self._frames) < FRAME_CACHE_SIZE:
+                self._frames[args] = frame
+        return frame
+
+    def __call__(self, *args: int) -> ApiCall:
+        readback = self._readback(*args) if self._readback is not None else None
+        return ApiCall(self, self.encode(*args), readback)
+
+    def decode(self, value: float | None) -> Any:
+        """Turn the value read back into the call's result."""
+        return self._decode(value) if self._decode is not None else value
+
+
+@lru_cache(maxsize=None)
+def sensor_command(sensor_type: int, mode: int) -> bytes:
+    """Frame asking for one reading of a sensor."""
+    return _SENSOR_COMMAND.pack(sensor_type, mode, 0)
@@ -0,0 +1,30 @@
+"""Diagnostics support for BatMon BLE."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .connection_pool import connection_pool_for
+from .coordinator import BatMonBLEConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: BatMonBLEConfigEntry
+) -> dict[str, Any]:
+    """Return the connection pool and latency state of a config entry."""
+    coordinator = entry.runtime_data
+    batmon = coordinator.batmon
+    return {
+        "sensors": coordinator.sensors,
+        "idle_timeout": batmon.idle_timeout,
+        "round_trip_deadline": batmon.latency.deadline(),
+        "round_trip_p95": batmon.latency.percentile(95),
+        "connection_pool": connection_pool_for(coordinator.ble_device).stats(),
+        "sync_group": None if (group := coordinator.sync_group) is None else {
+            "name": group.name,
+            "members": list(group.members),
+            "last_spread": group.last_spread,
+        },
+    }
@@ -0,0 +1,33 @@
+"""Base entity for BatMon BLE."""
+
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import BatMonBLEDataUpdateCoordinator
+
+
+class BatMonEntity(CoordinatorEntity[BatMonBLEDataUpdateCoordinator]):
+    """Coordinator entity that only writes state for new readings."""
+
+    _last_sequence: int | None = None
+    _last_success: bool | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # The coordinator keeps the bound method registered when the entity
+        # was added, so the work is looked up per call where a profile
+        # session can time it
+        self._async_process_coordinator_update()
+
+    @callback
+    def _async_process_coordinator_update(self) -> None:
+        """Skip the state write when neither readings nor availability changed."""
+        sequence = self.coordinator.data.sensors.sequence
+        success = self.coordinator.last_update_success
+        if sequence == self._last_sequence and success == self._last_success:
+            return
+        self._last_sequence = sequence
+        self._last_success = success
+        super()._handle_coordinator_update()
@@ -0,0 +1,144 @@
+"""Hourly long-term statistics built from every BatMon sample.
+
+Home Assistant compiles long-term statistics from recorded states. This
+aggregates the raw reading of every poll instead, and imports the finished
+hours as external statistics, one recorder call per statistic.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+)
+from homeassistant.const import (
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfPower,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util, slugify
+
+from .batmon import BatMonSensors
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key: (name suffix, unit)
+STATISTICS_SENSORS: dict[str, tuple[str, str]] = {
+    "volts": ("Voltage", UnitOfElectricPotential.VOLT),
+    "current": ("Current", UnitOfElectricCurrent.AMPERE),
+    "watts": ("Watts", UnitOfPower.WATT),
+}
+
+
+@dataclass(slots=True)
+class _HourAccumulator:
+    """Running mean, min and max of one statistic for one hour."""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+class StatisticsBuffer:
+    """Aggregates samples of one device and imports them once per hour."""
+
+    def __init__(self, hass: HomeAssistant, address: str, name: str) -> None:
+        self.hass = hass
+        self._name = name
+        self._statistic_ids = {
+            key: f"{DOMAIN}:{slugify(address)}_{key}" for key in STATISTICS_SENSORS
+        }
+        self._hours: dict[str, dict[datetime, _HourAccumulator]] = {
+            key: {} for key in STATISTICS_SENSORS
+        }
+        self._last_sample: dict[str, float] = {}
+        # Start of the newest hour imported per statistic. Importing an
+        # hour again replaces its row, so later samples for it are dropped
+        self._last_flushed: dict[str, datetime] = {}
+        self._unsub: Callable[[], None] | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Import finished hours shortly after every hour."""
+        self._unsub = async_track_utc_time_change(
+            self.hass, self._async_flush, minute=0, second=10)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop importing and drop whatever was not imported yet."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_add(self, sensors: BatMonSensors) -> None:
+        """Add the readings of one poll, each to the hour it was taken in."""
+        for key, hours in self._hours.items():
+            value = sensors.get(key)
+            acquired = sensors.timestamps.get(key)
+            # Readings carried over from an earlier snapshot are not new
+            if value is None or acquired is None or acquired <= self._last_sample.get(key, 0):
+                continue
+            self._last_sample[key] = acquired
+            start = dt_util.utc_from_timestamp(acquired).replace(
+                minute=0, second=0, microsecond=0)
+            if (flushed := self._last_flushed.get(key)) is not None and start <= flushed:
+                # A sweep that started before the hour was imported
+                _LOGGER.debug("Dropping late %s sample of %s, the hour is already imported",
+                              key, start)
+                continue
+            if (accumulator := hours.get(start)) is None:
+                accumulator = hours[start] = _HourAccumulator()
+            accumulator.add(value)
+
+    @callback
+    def _async_flush(self, now: datetime) -> None:
+        """Import every finished hour, one batch per statistic."""
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        for key, hours in self._hours.items():
+            finished = sorted(start for start in hours if start < current_hour)
+            if not finished:
+                continue
+            rows = []
+            for start in finished:
+                accumulator = hours.pop(start)
+                rows.append(StatisticData(
+                    start=start,
+                    mean=accumulator.total / accumulator.count,
+                    min=accumulator.min,
+                    max=accumulator.max,
+                ))
+            self._last_flushed[key] = finished[-1]
+            label, unit = STATISTICS_SENSORS[key]
+            metadata = StatisticMetaData(
+                mean_type=StatisticMeanType.ARITHMETIC,
+                has_sum=False,
+                name=f"{self._name} {label}",
+                source=DOMAIN,
+                statistic_id=self._statistic_ids[key],
+                unit_of_measurement=unit,
+            )
+            _LOGGER.debug("Importing %s hours of %s",
+                          len(rows), self._statistic_ids[key])
+            async_add_external_statistics(self.hass, metadata, rows)
@@ -0,0 +1,211 @@
+"""Headless BatMon poller.
+
+Polls any number of BatMons concurrently without Home Assistant and writes
+one record per sweep as JSON lines or CSV. Only needs bleak,
+bleak-retry-connector and async-interrupt:
+
+    python -m custom_components.batmon_bm AA:BB:CC:DD:EE:FF --interval 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+import csv
+import json
+import logging
+import sys
+import time
+from typing import IO, Any
+
+from bleak import BleakScanner
+from bleak.backends.device import BLEDevice
+
+from .batmon import BATMON_SENSOR_MAPPING, BatMonBluetoothDeviceData
+from .const import DEFAULT_SCAN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = 3
+DEFAULT_SCAN_TIMEOUT = 10.0
+
+RECORD_FIELDS = [
+    "timestamp",
+    "address",
+    "name",
+    *dict.fromkeys(attr for attr, _ in BATMON_SENSOR_MAPPING),
+    "watts",
+    "error",
+]
+
+
+async def async_poll_devices(
+    ble_devices: Iterable[BLEDevice],
+    interval: float = DEFAULT_SCAN_INTERVAL,
+    sweeps: int | None = None,
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    capacity: float | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Poll devices concurrently and yield a record per completed sweep.
+
+    At most ``max_concurrent`` devices are connected at a time. A failing
+    device yields a record with ``error`` set and keeps being polled.
+    ``sweeps`` limits the number of sweeps per device, None polls forever.
+    """
+    queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max_concurrent)
+    tasks = [
+        asyncio.create_task(
+            _poll_device(ble_device, queue, semaphore,
+                         interval, sweeps, capacity)
+        )
+        for ble_device in ble_devices
+    ]
+    running = len(tasks)
+    try:
+        while running:
+            record = await queue.get()
+            if record is None:
+                running -= 1
+                continue
+            yield record
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _poll_device(
+    ble_device: BLEDevice,
+    queue: asyncio.Queue[dict[str, Any] | None],
+    semaphore: asyncio.Semaphore,
+    interval: float,
+    sweeps: int | None,
+    capacity: float | None,
+) -> None:
+    """Poll one device until the sweep count is reached."""
+    batmon = BatMonBluetoothDeviceData()
+    loop = asyncio.get_running_loop()
+    sweep = 0
+    try:
+        while sweeps is None or sweep < sweeps:
+            started = loop.time()
+            record: dict[str, Any] = {
+                "address": ble_device.address,
+                "name": ble_device.name,
+            }
+            async with semaphore:
+                try:
+                    device = await batmon.update_device(
+                        ble_device, capacity is not None, capacity)
+                except Exception as err:  # pylint: disable=broad-except
+                    record["error"] = str(err) or type(err).__name__
+                else:
+                    record["name"] = device.name
+                    record.update(device.sensors)
+            record["timestamp"] = round(time.time(), 3)
+            await queue.put(record)
+            sweep += 1
+            if sweeps is None or sweep < sweeps:
+                await asyncio.sleep(max(0, interval - (loop.time() - started)))
+    finally:
+        queue.put_nowait(None)
+
+
+async def async_find_devices(
+    addresses: Iterable[str], timeout: float = DEFAULT_SCAN_TIMEOUT
+) -> list[BLEDevice]:
+    """Look up BatMons by address, skipping any that are not in range."""
+    addresses = list(addresses)
+    found = await asyncio.gather(
+        *(BleakScanner.find_device_by_address(address, timeout=timeout)
+          for address in addresses)
+    )
+    ble_devices = []
+    for address, ble_device in zip(addresses, found):
+        if ble_device is None:
+            _LOGGER.error("Could not find BatMon with address %s", address)
+            continue
+        ble_devices.append(ble_device)
+    return ble_devices
+
+
+class _JsonLinesWriter:
+    def __init__(self, stream: IO[str]) -> None:
+        self._stream = stream
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._stream.flush()
+
+
+class _CsvWriter:
+    def __init__(self, stream: IO[str]) -> None:
+        self._stream = stream
+        self._writer = csv.DictWriter(
+            stream, fieldnames=RECORD_FIELDS, extrasaction="ignore")
+        # Appending to an earlier run's file, which has its header
+        if not (stream.seekable() and stream.tell() > 0):
+            self._writer.writeheader()
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._writer.writerow(record)
+        self._stream.flush()
+
+
+WRITERS = {"jsonl": _JsonLinesWriter, "csv": _CsvWriter}
+
+
+async def _async_main(args: argparse.Namespace, stream: IO[str]) -> int:
+    ble_devices = await async_find_devices(args.addresses, args.scan_timeout)
+    if not ble_devices:
+        return 1
+    writer = WRITERS[args.format](stream)
+    async for record in async_poll_devices(
+        ble_devices,
+        interval=args.interval,
+        sweeps=args.count or None,
+        max_concurrent=args.max_concurrent,
+        capacity=args.capacity,
+    ):
+        writer.write(record)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m custom_components.batmon_bm",
+        description="Poll BatMon devices without Home Assistant.",
+    )
+    parser.add_argument("addresses", nargs="+", metavar="ADDRESS",
+                        help="Bluetooth address of a BatMon")
+    parser.add_argument("--interval", type=float, default=DEFAULT_SCAN_INTERVAL,
+                        help="seconds between sweeps of each device")
+    parser.add_argument("--count", type=int, default=0,
+                        help="sweeps per device, 0 polls until interrupted")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument("--output", help="file to append to instead of stdout")
+    parser.add_argument("--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT,
+                        help="devices connected at the same time")
+    parser.add_argument("--capacity", type=float,
+                        help="battery capacity in Ah, enables state of charge")
+    parser.add_argument("--scan-timeout", type=float, default=DEFAULT_SCAN_TIMEOUT)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        stream=sys.stderr,
+    )
+
+    stream = open(args.output, "a", encoding="utf-8",
+                  newline="") if args.output else sys.stdout
+    try:
+        return asyncio.run(_async_main(args, stream))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
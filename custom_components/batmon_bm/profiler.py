@@ -0,0 +1,202 @@
+"""On-demand profiling of the BatMon BLE hot paths.
+
+Nothing is patched or sampled until a session is started, so the
+integration runs at full speed the rest of the time.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+import cProfile
+from functools import wraps
+import inspect
+import json
+import sys
+import threading
+from time import perf_counter
+from types import CodeType
+from typing import Any
+
+from .batmon import BatMonBluetoothDeviceData, BatmonSensorCommand
+from .const import (
+    PROFILE_MODE_DETERMINISTIC as MODE_DETERMINISTIC,
+    PROFILE_MODE_SAMPLE as MODE_SAMPLE,
+)
+from .entity import BatMonEntity
+
+SAMPLE_INTERVAL = 0.005
+SUMMARY_TOP = 20
+
+# (owner, attribute, label) of the code paths timed by every session
+HOT_PATHS: list[tuple[type, str, str]] = [
+    (BatMonBluetoothDeviceData, "update_device", "update_device"),
+    (BatMonBluetoothDeviceData, "fetch_batmon_data", "fetch_batmon_data"),
+    (BatmonSensorCommand, "__init__", "decode"),
+    (BatMonEntity, "_async_process_coordinator_update", "entity_update"),
+]
+
+
+class _Timing:
+    """Call count and wall-clock time of one hot path."""
+
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+def _timed(func: Callable, timing: _Timing) -> Callable:
+    """Wrap a function or coroutine function to time its calls."""
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                timing.add(perf_counter() - start)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timing.add(perf_counter() - start)
+
+    return wrapper
+
+
+def _code_key(code: CodeType) -> str:
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id: int) -> None:
+        super().__init__(name="batmon_profile_sampler", daemon=True)
+        self._thread_id = thread_id
+        self._stop_event = threading.Event()
+        self.samples = 0
+        # Where the thread was, and what was anywhere on its stack
+        self.leaf: Counter[str] = Counter()
+        self.inclusive: Counter[str] = Counter()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self._thread_id)  # pylint: disable=protected-access
+            if frame is None:
+                continue
+            self.samples += 1
+            self.leaf[_code_key(frame.f_code)] += 1
+            seen: set[CodeType] = set()
+            while frame is not None:
+                seen.add(frame.f_code)
+                frame = frame.f_back
+            self.inclusive.update(_code_key(code) for code in seen)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileSession:
+    """Times the hot paths and profiles the calling thread until stopped.
+
+    Start and stop it from the event loop thread.
+    """
+
+    def __init__(self, mode: str = MODE_SAMPLE) -> None:
+        self.mode = mode
+        self.timings: dict[str, _Timing] = {}
+        self._originals: list[tuple[type, str, Any]] = []
+        self._profile: cProfile.Profile | None = None
+        self._sampler: _StackSampler | None = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        for owner, attribute, label in HOT_PATHS:
+            original = owner.__dict__[attribute]
+            timing = self.timings[label] = _Timing()
+            self._originals.append((owner, attribute, original))
+            setattr(owner, attribute, _timed(original, timing))
+        try:
+            if self.mode == MODE_DETERMINISTIC:
+                profile = cProfile.Profile()
+                # Fails while another profiler is active
+                profile.enable()
+                self._profile = profile
+            else:
+                self._sampler = _StackSampler(threading.get_ident())
+                self._sampler.start()
+        except BaseException:
+            self._sampler = None
+            self._restore()
+            raise
+        self._started = perf_counter()
+
+    def stop(self) -> None:
+        self.duration = perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self._restore()
+
+    def _restore(self) -> None:
+        """Put the original hot path functions back."""
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals.clear()
+
+    def summary(self) -> dict[str, Any]:
+        """Hot path timings and the most frequently seen functions."""
+        summary: dict[str, Any] = {
+            "mode": self.mode,
+            "duration_s": round(self.duration, 3),
+            "hot_paths": {
+                label: timing.as_dict() for label, timing in self.timings.items()
+            },
+        }
+        if self._sampler is not None:
+            summary["samples"] = self._sampler.samples
+            summary["top_leaf"] = dict(self._sampler.leaf.most_common(SUMMARY_TOP))
+            summary["top_inclusive"] = dict(
+                self._sampler.inclusive.most_common(SUMMARY_TOP))
+        return summary
+
+    def dump(self, path: str) -> None:
+        """Write the stats file, pstats format for deterministic sessions.
+
+        Does blocking I/O.
+        """
+        if self._profile is not None:
+            self._profile.dump_stats(path)
+            return
+        stats = self.summary()
+        assert self._sampler is not None
+        stats["leaf"] = dict(self._sampler.leaf)
+        stats["inclusive"] = dict(self._sampler.inclusive)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(stats, file, indent=2)
@@ -27,12 +27,12 @@ from homeassistant.helpers.entity_registry import (
     async_entries_for_device,
 )
 from homeassistant.helpers.typing import StateType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
 from .const import DOMAIN
 from .batmon import BatMonDevice
 from .coordinator import BatMonBLEDataUpdateCoordinator, BatMonBLEConfigEntry
+from .entity import BatMonEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -166,12 +166,10 @@ async def async_setup_entry(
     #             suggested_display_precision=1,
     #         )
 
+    # Entities exist for every sensor, even ones not read at the moment,
+    # so enabling a sensor in the options needs no reload
     entities = []
-    for sensor_type, sensor_value in coordinator.data.sensors.items():
-        if sensor_type not in sensors_mapping:
-            _LOGGER.warning(
-                f"Sensor type {sensor_type} not in sensors mapping")
-            continue
+    for sensor_type in sensors_mapping:
         async_migrate(hass, coordinator.data.address, sensor_type)
         # _LOGGER.debug(f"SENSOR setup sensor type: {sensor_type}, mapping: {sensors_mapping[sensor_type]}")
         entities.append(
@@ -183,7 +181,7 @@ async def async_setup_entry(
 
 
 class BatMonSensor(
-    CoordinatorEntity[BatMonBLEDataUpdateCoordinator], SensorEntity
+    BatMonEntity, SensorEntity
 ):
     """BatMon BLE sensors for the device."""
 
@@ -0,0 +1,169 @@
+"""Services for the BatMon BLE integration."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from functools import partial
+from importlib import import_module
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    DOMAIN,
+    PROFILE_MODE_DETERMINISTIC,
+    PROFILE_MODE_SAMPLE,
+    SERVICE_PROFILE,
+    SERVICE_SET_SWITCHES,
+)
+from .coordinator import (
+    BatMonBLEDataUpdateCoordinator,
+    async_get_coordinator_for_device,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_TARGETS = "targets"
+ATTR_DEVICE_ID = "device_id"
+ATTR_SWITCH = "switch"
+ATTR_STATE = "state"
+
+SWITCH_ATTRS = ["relay_state", "switch_state"]
+
+SET_SWITCHES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_TARGETS): vol.All(
+            cv.ensure_list,
+            vol.Length(min=1),
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_DEVICE_ID): cv.string,
+                        vol.Required(ATTR_SWITCH): vol.In(SWITCH_ATTRS),
+                        vol.Required(ATTR_STATE): cv.boolean,
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+ATTR_DURATION = "duration"
+ATTR_MODE = "mode"
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)),
+        vol.Optional(ATTR_MODE, default=PROFILE_MODE_SAMPLE): vol.In(
+            [PROFILE_MODE_SAMPLE, PROFILE_MODE_DETERMINISTIC]),
+    }
+)
+
+DATA_PROFILE = f"{DOMAIN}_profile"
+
+
+def _coordinator_for_device(
+    hass: HomeAssistant, device_id: str
+) -> BatMonBLEDataUpdateCoordinator:
+    """Find the loaded coordinator of a BatMon device."""
+    coordinator = async_get_coordinator_for_device(hass, device_id)
+    if coordinator is None:
+        raise ServiceValidationError(f"{device_id} is not a loaded BatMon device")
+    return coordinator
+
+
+async def _async_set_switch(
+    coordinator: BatMonBLEDataUpdateCoordinator,
+    target: dict[str, Any],
+) -> dict[str, Any]:
+    """Switch one target and report the state read back from the device."""
+    result: dict[str, Any] = {
+        ATTR_DEVICE_ID: target[ATTR_DEVICE_ID],
+        ATTR_SWITCH: target[ATTR_SWITCH],
+        "requested": target[ATTR_STATE],
+    }
+    address = coordinator.config_entry.unique_id
+    assert address is not None
+    try:
+        # The adapter's connection pool caps how many targets connect at once
+        result[ATTR_STATE] = await coordinator.async_send_switch_command(
+            target[ATTR_SWITCH], target[ATTR_STATE])
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.warning(
+            "Failed to set %s on %s: %s", target[ATTR_SWITCH], address, err)
+        result["error"] = str(err) or type(err).__name__
+    return result
+
+
+async def _async_set_switches(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Switch relays and switch pins on several BatMons concurrently."""
+    # Resolve every target first so a typo fails the call before anything
+    # is switched
+    targets = [
+        (_coordinator_for_device(hass, target[ATTR_DEVICE_ID]), target)
+        for target in call.data[ATTR_TARGETS]
+    ]
+    results = await asyncio.gather(
+        *(_async_set_switch(coordinator, target)
+          for coordinator, target in targets)
+    )
+    return {"results": list(results)}
+
+
+async def _async_profile(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Profile the integration for a while and write a stats file."""
+    # cProfile and the sampler are only needed once somebody profiles
+    profiler = await hass.async_add_import_executor_job(
+        import_module, f"{__package__}.profiler")
+    if DATA_PROFILE in hass.data:
+        raise ServiceValidationError("A BatMon profile is already running")
+    session = hass.data[DATA_PROFILE] = profiler.ProfileSession(call.data[ATTR_MODE])
+    try:
+        session.start()
+        await asyncio.sleep(call.data[ATTR_DURATION])
+    finally:
+        session.stop()
+        del hass.data[DATA_PROFILE]
+
+    suffix = "prof" if session.mode == PROFILE_MODE_DETERMINISTIC else "json"
+    path = hass.config.path(
+        f"batmon_profile.{datetime.now().strftime('%Y%m%d%H%M%S')}.{suffix}")
+    await hass.async_add_executor_job(session.dump, path)
+    summary = session.summary()
+    _LOGGER.info("BatMon profile written to %s: %s",
+                 path, summary["hot_paths"])
+    return {"file": path, **summary}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the BatMon services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_SWITCHES,
+        partial(_async_set_switches, hass),
+        schema=SET_SWITCHES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        partial(_async_profile, hass),
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 
-from .batmon import BatMonBluetoothDeviceData, BatMonDevice 
+from .batmon import BatMonDevice
 from homeassistant.core import HomeAssistant
 from homeassistant.components.switch import (
     SwitchEntity,
@@ -15,13 +15,9 @@ from homeassistant.const import (
 )
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util.unit_system import METRIC_SYSTEM
-from homeassistant.components import bluetooth
-from bleak_retry_connector import close_stale_connections_by_address
-from homeassistant.exceptions import ConfigEntryNotReady
 
 from .coordinator import BatMonBLEDataUpdateCoordinator, BatMonBLEConfigEntry
+from .entity import BatMonEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,11 +44,7 @@ async def async_setup_entry(
     entities = []
     switch_mapping = SWITCH_MAPPING_TEMPLATE.copy()
     # _LOGGER.debug("got sensors: %s", coordinator.data.sensors)
-    for switch_type, sensor_value in coordinator.data.sensors.items():
-        if switch_type not in switch_mapping:
-            _LOGGER.warning(
-                f"SWITCH type {switch_type} not in sensors mapping")
-            continue
+    for switch_type in switch_mapping:
         entities.append(
             BatMonSwitch(coordinator, coordinator.data,
                          switch_mapping[switch_type])
@@ -62,7 +54,7 @@ async def async_setup_entry(
 
 
 class BatMonSwitch(
-    CoordinatorEntity[BatMonBLEDataUpdateCoordinator], SwitchEntity
+    BatMonEntity, SwitchEntity
 ):
     """BatMon BLE Switch for the device."""
 
@@ -94,6 +86,14 @@ class BatMonSwitch(
             name=name,
         )
 
+    @property
+    def available(self) -> bool:
+        """Check if device and switch is available in data."""
+        return (
+            super().available
+            and self.attribute in self.coordinator.data.sensors
+        )
+
     @property
     def is_on(self):
         """Return the state of the binary sensor."""
@@ -103,35 +103,10 @@ class BatMonSwitch(
         """Turn the switch on."""
         _LOGGER.debug(f"Turning ON switch {
                       self.name} ({self.attribute})")
-        ret = await self._send_switch_command(self.attribute, True)
-        # Update the coordinator's data to reflect the new state
-        self.coordinator.data.sensors[self.attribute] = ret
-        self.async_write_ha_state()
+        await self.coordinator.async_send_switch_command(self.attribute, True)
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
         _LOGGER.debug(f"Turning OFF switch {
                       self.name} ({self.attribute})")
-        ret = await self._send_switch_command(self.attribute, False)
-        # Update the coordinator's data to reflect the new state
-        self.coordinator.data.sensors[self.attribute] = ret
-        self.async_write_ha_state()
-
-    async def _send_switch_command(self, attr, turn_on):
-        address = self.batmon_device.address
-
-        assert address is not None
-
-        await close_stale_connections_by_address(address)
-
-        ble_device = bluetooth.async_ble_device_from_address(
-            self.hass, address)
-
-        if not ble_device:
-            raise ConfigEntryNotReady(
-                f"Could not find Batmon device with address {address}"
-            )
-        batmon = BatMonBluetoothDeviceData(
-            _LOGGER, self.hass.config.units is METRIC_SYSTEM)
-        ret = await batmon.send_switch_command(ble_device, attr, turn_on)
-        return ret
+        await self.coordinator.async_send_switch_command(self.attribute, False)
@@ -0,0 +1,133 @@
+"""Synchronized sampling of the BatMons on one bank.
+
+The coordinators of a sync group stop polling on their own clocks. The
+group refreshes all of them together instead, and a fresh SampleBarrier
+per round holds every device, connected, until the others are too, so
+their volts and current are read within a tight window.
+
+Only as many devices as an adapter's connection pool has slots can be
+connected, and so synchronized, at once. Members beyond that are
+refreshed after the synchronized ones, on their own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .batmon import SampleBarrier
+from .connection_pool import adapter_of, connection_pool_for
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import BatMonBLEDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SYNC_GROUPS = f"{DOMAIN}_sync_groups"
+
+
+class SyncGroup:
+    """BatMons sampled together, at the shortest scan interval among them."""
+
+    def __init__(self, hass: HomeAssistant, name: str) -> None:
+        self.hass = hass
+        self.name = name
+        self.members: dict[str, BatMonBLEDataUpdateCoordinator] = {}
+        # Seconds between the first and last volts reading of the last round
+        self.last_spread: float | None = None
+        self._unsub: Callable[[], None] | None = None
+        self._interval: timedelta | None = None
+        self._sampling = False
+
+    @callback
+    def async_add(self, coordinator: BatMonBLEDataUpdateCoordinator) -> None:
+        if coordinator.address not in self.members:
+            self.members[coordinator.address] = coordinator
+            if self._split_members()[1]:
+                _LOGGER.warning(
+                    "Sync group %s has more BatMons on one adapter than it has "
+                    "connection slots, the extra ones are not sampled together",
+                    self.name)
+        self._async_reschedule()
+
+    @callback
+    def async_remove(self, coordinator: BatMonBLEDataUpdateCoordinator) -> None:
+        if self.members.get(coordinator.address) is coordinator:
+            del self.members[coordinator.address]
+        if not self.members:
+            self.hass.data[DATA_SYNC_GROUPS].pop(self.name, None)
+        self._async_reschedule()
+
+    @callback
+    def _async_reschedule(self) -> None:
+        interval = min(
+            (member.scan_interval for member in self.members.values()), default=None)
+        if interval == self._interval:
+            return
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._interval = interval
+        if interval is not None:
+            self._unsub = async_track_time_interval(
+                self.hass, self._async_sample, interval,
+                name=f"BatMon sync group {self.name}")
+
+    async def _async_sample(self, now: datetime | None = None) -> None:
+        """Refresh every member, taking their first reads together."""
+        if self._sampling:
+            _LOGGER.debug("Sync group %s is still sampling, skipping", self.name)
+            return
+        members, extra = self._split_members()
+        barrier = SampleBarrier(member.ble_device.address for member in members)
+        self._sampling = True
+        try:
+            await asyncio.gather(
+                *(member.async_refresh_synchronized(barrier) for member in members))
+            # These could not have connected while the others held the slots
+            await asyncio.gather(*(member.async_refresh() for member in extra))
+        finally:
+            self._sampling = False
+
+        sampled = [
+            acquired for member in members
+            if member.data is not None
+            and (acquired := member.data.sensors.timestamps.get("volts")) is not None
+            and barrier.released_at is not None
+            and acquired >= barrier.released_at
+        ]
+        self.last_spread = max(sampled) - min(sampled) if len(sampled) > 1 else None
+        _LOGGER.debug("Sync group %s sampled %s of %s devices within %ss",
+                      self.name, len(sampled), len(self.members), self.last_spread)
+
+    def _split_members(
+        self,
+    ) -> tuple[list[BatMonBLEDataUpdateCoordinator], list[BatMonBLEDataUpdateCoordinator]]:
+        """Split the members into those that fit the adapters' pools and the rest."""
+        synchronized = []
+        extra = []
+        per_adapter: dict[str, int] = {}
+        for member in self.members.values():
+            adapter = adapter_of(member.ble_device)
+            count = per_adapter[adapter] = per_adapter.get(adapter, 0) + 1
+            if count > connection_pool_for(member.ble_device).max_connections:
+                extra.append(member)
+            else:
+                synchronized.append(member)
+        return synchronized, extra
+
+
+@callback
+def async_get_sync_group(hass: HomeAssistant, name: str) -> SyncGroup:
+    """Return the sync group with that name, creating it if needed."""
+    groups: dict[str, SyncGroup] = hass.data.setdefault(DATA_SYNC_GROUPS, {})
+    if (group := groups.get(name)) is None:
+        group = groups[name] = SyncGroup(hass, name)
+    return group
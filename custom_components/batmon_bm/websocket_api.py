@@ -0,0 +1,240 @@
+"""WebSocket API streaming BatMon samples to the frontend.
+
+Samples go straight from the coordinator to the subscribers, so live views
+can follow every poll without going through the state machine or recorder.
+While a device has subscribers it is also polled for just their fields, as
+often as the most demanding one asked for. Those samples only go to the
+subscribers, entities and statistics keep following the scan interval.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import monotonic
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .batmon import BATMON_SENSOR_KEYS, BatMonSensors
+from .const import DOMAIN
+from .coordinator import BatMonBLEDataUpdateCoordinator, async_get_coordinator_for_device
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_FIELDS = "fields"
+ATTR_MIN_INTERVAL = "min_interval"
+
+DATA_LIVE_POLLERS = f"{DOMAIN}_live_pollers"
+
+# Seconds to wait before polling again after a failed live poll
+LIVE_POLL_RETRY_DELAY = 5
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the BatMon WebSocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_samples)
+
+
+class _SampleSubscription:
+    """Forwards new samples of one coordinator to one subscriber.
+
+    Samples arriving within ``min_interval`` of the last one sent are
+    coalesced, and the newest is sent once the interval has passed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        coordinator: BatMonBLEDataUpdateCoordinator,
+        fields: list[str] | None,
+        min_interval: float,
+    ) -> None:
+        self.hass = hass
+        self._connection = connection
+        self._msg_id = msg_id
+        self._coordinator = coordinator
+        self._fields = fields
+        self._min_interval = min_interval
+        self._last_sequence: int | None = None
+        self._latest: BatMonSensors | None = None
+        self._last_sent = float("-inf")
+        self._cancel_send: CALLBACK_TYPE | None = None
+        self._unsub_coordinator = coordinator.async_add_listener(self.async_update)
+        self._live_poller = _async_get_live_poller(hass, coordinator)
+        self._live_poller.async_add(self)
+
+    @property
+    def fields(self) -> list[str] | None:
+        return self._fields
+
+    @property
+    def min_interval(self) -> float:
+        return self._min_interval
+
+    @callback
+    def async_unsubscribe(self) -> None:
+        self._unsub_coordinator()
+        self._live_poller.async_remove(self)
+        if self._cancel_send is not None:
+            self._cancel_send()
+            self._cancel_send = None
+
+    @callback
+    def async_update(self) -> None:
+        """Forward the coordinator's current sample."""
+        if self._coordinator.data is not None:
+            self.async_add_sample(self._coordinator.data.sensors)
+
+    @callback
+    def async_add_sample(self, sensors: BatMonSensors) -> None:
+        """Send a sample now, or once the subscriber's interval allows."""
+        if self._last_sequence is not None and sensors.sequence <= self._last_sequence:
+            return
+        if self._latest is not None and sensors.sequence <= self._latest.sequence:
+            return
+        self._latest = sensors
+        if self._cancel_send is not None:
+            return
+        wait = self._last_sent + self._min_interval - monotonic()
+        if wait > 0:
+            self._cancel_send = async_call_later(self.hass, wait, self._async_send_later)
+            return
+        self._async_send()
+
+    @callback
+    def _async_send_later(self, _now: Any) -> None:
+        self._cancel_send = None
+        self._async_send()
+
+    @callback
+    def _async_send(self) -> None:
+        sensors = self._latest
+        self._latest = None
+        self._last_sequence = sensors.sequence
+        self._last_sent = monotonic()
+        keys = sensors if self._fields is None else [
+            key for key in self._fields if key in sensors]
+        self._connection.send_message(websocket_api.event_message(self._msg_id, {
+            "sequence": sensors.sequence,
+            "sensors": {key: sensors[key] for key in keys},
+            "timestamps": {key: sensors.timestamps[key] for key in keys},
+        }))
+
+
+class _LivePoller:
+    """Polls the fields of one device's subscribers, for them only.
+
+    Runs while the device has subscribers, as often as the smallest
+    ``min_interval`` among them allows, back to back for 0.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: BatMonBLEDataUpdateCoordinator
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self._subscriptions: set[_SampleSubscription] = set()
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_add(self, subscription: _SampleSubscription) -> None:
+        self._subscriptions.add(subscription)
+        if self._task is None:
+            self._task = self.coordinator.config_entry.async_create_background_task(
+                self.hass, self._async_poll(),
+                f"BatMon live samples of {self.coordinator.address}")
+
+    @callback
+    def async_remove(self, subscription: _SampleSubscription) -> None:
+        self._subscriptions.discard(subscription)
+        if self._subscriptions:
+            return
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        pollers = self.hass.data[DATA_LIVE_POLLERS]
+        if pollers.get(self.coordinator.address) is self:
+            del pollers[self.coordinator.address]
+
+    def _fields(self) -> list[str] | None:
+        """Every field a subscriber asked for, None when one wants them all."""
+        fields: set[str] = set()
+        for subscription in self._subscriptions:
+            if subscription.fields is None:
+                return None
+            fields.update(subscription.fields)
+        return [key for key in BATMON_SENSOR_KEYS if key in fields]
+
+    async def _async_poll(self) -> None:
+        coordinator = self.coordinator
+        while self._subscriptions:
+            started = monotonic()
+            try:
+                device = await coordinator.batmon.update_device(
+                    coordinator.ble_device,
+                    coordinator.state_of_charge_required,
+                    coordinator.battery_capacity,
+                    self._fields(),
+                )
+            except Exception as err:
+                _LOGGER.debug("Live poll of %s failed: %s", coordinator.address, err)
+                await asyncio.sleep(LIVE_POLL_RETRY_DELAY)
+                continue
+            for subscription in list(self._subscriptions):
+                subscription.async_add_sample(device.sensors)
+            interval = min(
+                (subscription.min_interval for subscription in self._subscriptions),
+                default=0)
+            # Yield even when polling back to back
+            await asyncio.sleep(max(0, started + interval - monotonic()))
+
+
+@callback
+def _async_get_live_poller(
+    hass: HomeAssistant, coordinator: BatMonBLEDataUpdateCoordinator
+) -> _LivePoller:
+    pollers: dict[str, _LivePoller] = hass.data.setdefault(DATA_LIVE_POLLERS, {})
+    poller = pollers.get(coordinator.address)
+    if poller is None or poller.coordinator is not coordinator:
+        poller = pollers[coordinator.address] = _LivePoller(hass, coordinator)
+    return poller
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_samples",
+        vol.Required(ATTR_DEVICE_ID): str,
+        vol.Optional(ATTR_FIELDS): [vol.In(BATMON_SENSOR_KEYS)],
+        vol.Optional(ATTR_MIN_INTERVAL, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+@callback
+def websocket_subscribe_samples(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream the samples of a BatMon, starting with the current one."""
+    coordinator = async_get_coordinator_for_device(hass, msg[ATTR_DEVICE_ID])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND,
+            f"{msg[ATTR_DEVICE_ID]} is not a loaded BatMon device")
+        return
+
+    subscription = _SampleSubscription(
+        hass, connection, msg["id"], coordinator,
+        msg.get(ATTR_FIELDS), msg[ATTR_MIN_INTERVAL])
+    connection.subscriptions[msg["id"]] = subscription.async_unsubscribe
+    connection.send_result(msg["id"])
+    subscription.async_update()
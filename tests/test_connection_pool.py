@@ -0,0 +1,69 @@
+"""Tests of the per-adapter connection pool."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from bleak.backends.device import BLEDevice
+
+from custom_components.batmon_bm.connection_pool import BatMonConnectionPool
+
+
+class _SlowDisconnectClient:
+    """Client whose disconnect only returns once ``release`` is set."""
+
+    def __init__(self, address: str, release: asyncio.Event) -> None:
+        self.address = address
+        self.is_connected = True
+        self._release = release
+
+    async def disconnect(self) -> None:
+        await self._release.wait()
+        self.is_connected = False
+
+
+def _device(index: int) -> BLEDevice:
+    return BLEDevice(f"AA:00:00:00:00:0{index}", f"BatMon {index}",
+                     {"source": "hci0"}, rssi=-60)
+
+
+class BatMonConnectionPoolTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.release_disconnect = asyncio.Event()
+        self.pool = BatMonConnectionPool("hci0", max_connections=2)
+
+        async def establish_connection(client_class, ble_device, name, **kwargs):
+            return _SlowDisconnectClient(ble_device.address, self.release_disconnect)
+
+        patcher = patch(
+            "custom_components.batmon_bm.connection_pool.establish_connection",
+            establish_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_acquire_during_eviction_stays_within_slots(self) -> None:
+        """A slot freed by an eviction is not handed out twice."""
+        for index in range(2):
+            connection = await self.pool.acquire(_device(index), 0)
+            await self.pool.release(connection, idle_timeout=60)
+
+        # Evicts one idle connection and waits for it to disconnect
+        evicting = asyncio.create_task(self.pool.acquire(_device(2), 0))
+        await asyncio.sleep(0)
+        # Arrives while the victim is still disconnecting
+        arriving = asyncio.create_task(self.pool.acquire(_device(3), 0))
+        await asyncio.sleep(0)
+        self.release_disconnect.set()
+        await asyncio.gather(evicting, arriving)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["connections"], 2)
+        self.assertEqual(stats["in_use"], 2)
+        self.assertEqual(stats["evictions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()